@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Measures the size of the Spotlight vulnerability pages with and without projection.
+
+A synthetic page of Spotlight vulnerability records is generated in memory and
+decoded the way the finding iterator does, both into Box objects with every field
+(the previous behaviour) and into plain dictionaries reduced to the fields that the
+transformer uses.  The wire bytes, retained memory and decode time per record are
+reported for each variant.  Usage:
+
+    python -m benchmarks.spotlight_projection --records 5000
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from box import Box
+
+from crowdstrike.api.findings import FINDING_FIELDS
+from crowdstrike.api.projection import project
+
+
+def record(idx: int, facets: list[str]) -> dict[str, Any]:
+    """
+    Returns a synthetic Spotlight vulnerability record with the requested facets.
+    """
+    vuln = {
+        'id': f'{idx:032x}_{idx:032x}',
+        'cid': 'c' * 32,
+        'aid': f'{idx % 1000:032x}',
+        'vulnerability_id': f'CVE-2024-{idx % 50000:05d}',
+        'data_providers': [{'provider': 'Falcon sensor'}],
+        'created_timestamp': '2025-01-09T09:12:55Z',
+        'updated_timestamp': '2025-02-21T00:48:53Z',
+        'status': 'open',
+        'confidence': 'confirmed',
+        'suppression_info': {'is_suppressed': False},
+        'apps': [
+            {
+                'vendor_normalized': 'Ubuntu',
+                'product_name_version': f'linux-signed 6.8.0-{idx % 90}.52',
+                'product_name_normalized': 'linux-signed',
+                'sub_status': 'open',
+                'remediation': {'ids': [f'{idx:032x}']},
+                'evaluation_logic': {'id': f'{idx:032x}'},
+            }
+        ],
+    }
+    if 'cve' in facets:
+        vuln['cve'] = {
+            'id': vuln['vulnerability_id'],
+            'base_score': 7.8,
+            'severity': 'HIGH',
+            'exploit_status': 0,
+            'exprt_rating': 'MEDIUM',
+            'remediation_level': 'U',
+            'cisa_info': {'is_cisa_kev': False},
+            'spotlight_published_date': '2024-11-13T17:09:00Z',
+            'types': ['Vulnerability'],
+            'cwes': ['CWE-399'],
+            'description': 'In the Linux kernel, the following vulnerability ' * 6,
+            'published_date': '2024-11-09T00:00:00Z',
+            'references': [
+                f'https://www.cve.org/CVERecord?id={vuln["vulnerability_id"]}',
+                'https://git.kernel.org/stable/c/' + 'f' * 40,
+            ],
+            'exploitability_score': 1.8,
+            'impact_score': 5.9,
+            'vector': 'CVSS:3.1/AV:L/AC:L/PR:L/UI:N/S:U/C:H/I:H/A:H',
+        }
+    if 'host_info' in facets:
+        vuln['host_info'] = {
+            'hostname': f'host-{idx % 1000}',
+            'local_ip': '10.0.0.1',
+            'machine_domain': 'example.com',
+            'os_version': 'Ubuntu 24.04',
+            'ou': 'Servers',
+            'site_name': 'Default-First-Site-Name',
+            'system_manufacturer': 'Amazon EC2',
+            'tags': ['SensorGroupingTags/servers'],
+            'platform': 'Linux',
+            'instance_id': 'i-0123456789abcdef0',
+            'asset_criticality': 'Unassigned',
+        }
+    if 'remediation' in facets:
+        vuln['remediation'] = {
+            'entities': [
+                {
+                    'id': f'{idx:032x}',
+                    'reference': 'linux-signed',
+                    'title': 'Update Ubuntu linux-signed',
+                    'action': 'Update linux-signed to the latest version ' * 3,
+                    'link': 'https://ubuntu.com/security/notices',
+                    'vendor_url': 'https://ubuntu.com/security',
+                }
+            ]
+        }
+    return vuln
+
+
+def page(records: int, facets: list[str]) -> bytes:
+    """
+    Returns the JSON encoded page of records.
+    """
+    return json.dumps(
+        {
+            'meta': {'pagination': {'limit': records, 'total': records}},
+            'resources': [record(i, facets) for i in range(records)],
+        }
+    ).encode()
+
+
+def measure(decode: Callable[[bytes], Any], data: bytes) -> tuple[int, float]:
+    """
+    Decodes the page and returns the retained memory (bytes) and elapsed seconds.
+    The page is decoded twice, as tracing the allocations skews the timing.
+    """
+    started = time.perf_counter()
+    decode(data)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    decoded = decode(data)
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del decoded
+    return retained, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--records', type=int, default=5000)
+    args = parser.parse_args()
+
+    def boxed(data: bytes) -> Box:
+        return Box(json.loads(data))
+
+    def projected(data: bytes) -> dict[str, Any]:
+        resp = json.loads(data)
+        resp['resources'] = project(resp['resources'], FINDING_FIELDS)
+        return resp
+
+    variants = (
+        ('all facets, box', ['cve', 'host_info', 'remediation'], boxed),
+        ('cve facet, box', ['cve'], boxed),
+        ('cve facet, projected', ['cve'], projected),
+    )
+    print(f'{"variant":>22}  {"wire B/rec":>10}  {"memory B/rec":>12}  {"decode":>8}')
+    for name, facets, decode in variants:
+        data = page(args.records, facets)
+        retained, elapsed = measure(decode, data)
+        print(
+            f'{name:>22}  {len(data) / args.records:10.0f}  '
+            f'{retained / args.records:12.0f}  {elapsed:7.3f}s'
+        )
+
+
+if __name__ == '__main__':
+    main()
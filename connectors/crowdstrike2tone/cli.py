@@ -89,6 +89,20 @@ def run(
             help='How many days back from today should we pull crowdstrike data for? ',
         ),
     ] = 1,
+    since: Annotated[
+        int | None,
+        Option(
+            envvar='CROWDSTRIKE_SINCE',
+            help='Only pull the data changed since this (unix) timestamp',
+        ),
+    ] = None,
+    finding_shards: Annotated[
+        int,
+        Option(
+            envvar='CROWDSTRIKE_FINDING_SHARDS',
+            help='How many time slices of the findings to download concurrently',
+        ),
+    ] = 1,
     download_vulns: Annotated[
         bool, Option(help='Import Falson Spotlight Vulndreability Findings?')
     ] = False,
@@ -113,7 +127,12 @@ def run(
         member_cid=crowdstrike_member_cid,
     )
     c2t1 = Transformer(tvm=tvm, crwd=crwd)
-    c2t1.run(get_findings=download_vulns, last_seen_days=last_seen_days)
+    c2t1.run(
+        get_findings=download_vulns,
+        last_seen_days=last_seen_days,
+        since=since,
+        finding_shards=finding_shards,
+    )
 
 
 if __name__ == '__main__':
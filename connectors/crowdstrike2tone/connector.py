@@ -65,6 +65,17 @@ class AppSettings(Settings):
         ),
     ] = True
 
+    incremental: Annotated[
+        bool,
+        Field(
+            title='Incremental Sync',
+            description=(
+                'Only import the assets and findings that changed since the last '
+                'successful run'
+            ),
+        ),
+    ] = False
+
 
 connector = Connector(
     settings=AppSettings, credentials=[CrowdstrikeCredential, TenableCloudCredential]
@@ -78,7 +89,9 @@ def main(config: AppSettings, since: int | None = None):
     """
     transformer = Transformer()
     counts = transformer.run(
-        get_findings=config.import_findings, last_seen_days=config.last_seen_days
+        get_findings=config.import_findings,
+        last_seen_days=config.last_seen_days,
+        since=since if config.incremental else None,
     )
     return {'counts': counts}
 
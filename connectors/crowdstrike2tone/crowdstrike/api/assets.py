@@ -1,6 +1,7 @@
 from typing import Dict, List, Optional, Union
 
 import arrow
+from arrow import Arrow
 from box import Box, BoxList
 from requests import Response
 from restfly.endpoint import APIEndpoint
@@ -16,6 +17,9 @@ class AssetsAPI(APIEndpoint):
         sort: Optional[str] = 'last_seen.asc',
         last_seen_days: Optional[int] = 1,
         filter: Optional[str] | None = None,
+        since: Optional[Arrow | int | str] = None,
+        chunk_size: int = 1000,
+        max_workers: int = 4,
         **kwargs,
     ) -> CrowdstrikeAssetIterator:
         """
@@ -30,6 +34,15 @@ class AssetsAPI(APIEndpoint):
                 the number of days back to search back if filter isn't provided.
             filter (str, optional):
                 The filter string in FQL format to filter CS assets
+            since (Arrow|int|str, optional):
+                Only return the hosts seen since this time.  Takes precedence over
+                ``last_seen_days`` if filter isn't provided.
+            chunk_size (int, optional):
+                How many device ids to request the details for in each call.  The
+                ids of each scroll page are split into chunks of this size.
+            max_workers (int, optional):
+                How many calls may be in flight at the same time, counting the
+                device detail calls and the background scroll call.
         Returns:
             CrowdstrikeAssetIterator
 
@@ -47,11 +60,12 @@ class AssetsAPI(APIEndpoint):
         if filter:
             params['filter'] = filter
         else:
-            last_seen = (
-                arrow.utcnow()
-                .shift(days=-last_seen_days)
-                .format('YYYY-MM-DDTHH:mm:ssZ')
+            start = (
+                arrow.get(since)
+                if since is not None
+                else arrow.utcnow().shift(days=-last_seen_days)
             )
+            last_seen = start.format('YYYY-MM-DDTHH:mm:ssZ')
             params['filter'] = (
                 f"last_seen:>='{last_seen}'"  # +provision.status:['Provisioned']"
             )
@@ -60,6 +74,8 @@ class AssetsAPI(APIEndpoint):
             _envelope='resources',
             _path=_path,
             _params=params,
+            _chunk_size=min(chunk_size, 5000),
+            _max_workers=max_workers,
         )
 
     def _device_details(
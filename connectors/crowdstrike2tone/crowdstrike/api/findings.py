@@ -1,9 +1,48 @@
-from typing import Literal, Optional
+from typing import Any, Generator, Iterable, Literal, Optional
 
 import arrow
+from arrow import Arrow
 from restfly.endpoint import APIEndpoint
 
-from .iterator import CrowdstrikeFindingIterator
+from .iterator import CrowdstrikeFindingIterator, merge_iterators
+from .projection import Projection
+
+# The fields of each vulnerability record used by the transformer.
+FINDING_FIELDS: Projection = {
+    'id': None,
+    'aid': None,
+    'vulnerability_id': None,
+    'status': None,
+    'created_timestamp': None,
+    'updated_timestamp': None,
+    'apps': {
+        'vendor_normalized': None,
+        'product_name_version': None,
+        'product_name_normalized': None,
+    },
+    'cve': {'id': None, 'severity': None},
+}
+
+
+def time_slices(start: Arrow, end: Arrow, shards: int) -> list[tuple[Arrow, Arrow]]:
+    """
+    Splits the time window into contiguous slices of equal length.  The slice
+    boundaries are truncated to the second, as that's the resolution of the FQL
+    timestamps, so each slice starts exactly where the previous one ends.
+
+    Args:
+        start: The start of the window
+        end: The end of the window
+        shards: How many slices to return (at most)
+
+    Returns:
+        A list of ``(start, end)`` tuples.
+    """
+    start, end = start.floor('second'), end.floor('second')
+    seconds = int((end - start).total_seconds())
+    shards = max(1, min(shards, seconds))
+    bounds = [start.shift(seconds=seconds * i // shards) for i in range(shards)]
+    return list(zip(bounds, [*bounds[1:], end], strict=True))
 
 
 class FindingsAPI(APIEndpoint):
@@ -20,6 +59,10 @@ class FindingsAPI(APIEndpoint):
         limit: int = 5000,
         sort: Optional[Literal['updated_timestamp|asc', 'closed_timestamp|asc']] = None,
         last_seen_days: Optional[int] = 1,
+        since: Optional[Arrow | int | str] = None,
+        until: Optional[Arrow | int | str] = None,
+        facets: Iterable[str] = ('cve',),
+        fields: Optional[Projection] = None,
     ) -> CrowdstrikeFindingIterator:
         """
         Retrieves a list of vulnerabilities.
@@ -33,8 +76,24 @@ class FindingsAPI(APIEndpoint):
             filter:
                 The filter string in FQL format to filter CS findings with.
                 Defaults to ``None``.
-            facet:
-                The list of fields to facet the results by. Defaults to ``None``.
+            last_seen_days:
+                The number of days back to collect the updated vulnerabilities for.
+            since:
+                Only return the vulnerabilities updated since this time.  Takes
+                precedence over ``last_seen_days``.
+            until:
+                Only return the vulnerabilities last updated at or before this
+                time.
+            facets:
+                The facets (``cve``, ``host_info``, ``remediation``,
+                ``evaluation_logic``) to include within each record.  Defaults to
+                just ``cve``.
+            fields:
+                The fields to keep from each record (see
+                `crowdstrike.api.projection`), e.g. ``FINDING_FIELDS`` for just the
+                fields used by the transformer.  The projected records are plain
+                dictionaries.  If ``None`` (the default), the records are returned
+                in full as ``Box`` objects.
 
         Returns:
             CrowdstrikeFindingIterator
@@ -46,12 +105,63 @@ class FindingsAPI(APIEndpoint):
                 f'limit must be <= 5000; {limit} provided. Setting to 5000.'
             )
             limit = 5000
-        params = {'limit': limit, 'sort': sort, 'facet': 'cve'}
+        params = {'limit': limit, 'sort': sort, 'facet': list(facets)}
 
-        last_seen = (
-            arrow.utcnow().shift(days=-last_seen_days).format('YYYY-MM-DDTHH:mm:ssZ')
+        start = (
+            arrow.get(since)
+            if since is not None
+            else arrow.utcnow().shift(days=-last_seen_days)
         )
+        last_seen = start.format('YYYY-MM-DDTHH:mm:ssZ')
         params['filter'] = f'updated_timestamp:>"{last_seen}"+{status_filter}'
+        if until is not None:
+            last_updated = arrow.get(until).format('YYYY-MM-DDTHH:mm:ssZ')
+            params['filter'] += f'+updated_timestamp:<="{last_updated}"'
         return CrowdstrikeFindingIterator(
-            self._api, _envelope='resources', _path=self._path, _params=params
+            self._api,
+            _envelope='resources',
+            _path=self._path,
+            _params=params,
+            _fields=fields,
+        )
+
+    def vulns_sharded(
+        self,
+        shards: int = 4,
+        last_seen_days: Optional[int] = 1,
+        since: Optional[Arrow | int | str] = None,
+        **kwargs,
+    ) -> Generator[dict[str, Any], None, None]:
+        """
+        Retrieves the vulnerabilities updated within the window, splitting the
+        window into time slices and following the cursor chain of each slice
+        concurrently.
+
+        The window ends at the time of the call, so any vulnerability updated
+        while the slices are being collected is left for the next (incremental)
+        run.  The slices are disjoint (``>`` the start and ``<=`` the end of each
+        slice), so every vulnerability is returned by exactly one chain and the
+        results aren't de-duplicated.
+
+        Args:
+            shards: How many time slices to collect concurrently.
+            last_seen_days:
+                The number of days back to collect the updated vulnerabilities for.
+            since:
+                Only return the vulnerabilities updated since this time.  Takes
+                precedence over ``last_seen_days``.
+            **kwargs: Passed on to the `vulns` method of each slice.
+
+        Returns:
+            Generator of the merged vulnerabilities
+        """
+        end = arrow.utcnow()
+        start = (
+            arrow.get(since) if since is not None else end.shift(days=-last_seen_days)
         )
+        slices = time_slices(start, end, shards)
+        self._log.info(f'Collecting the vulnerabilities in {len(slices)} time slices')
+        iterators = [
+            self.vulns(since=low, until=high, **kwargs) for low, high in slices
+        ]
+        yield from merge_iterators(iterators)
@@ -1,23 +1,99 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from copy import copy
-from typing import Any, Dict
+from queue import Empty, Full, Queue
+from typing import Any, Dict, Generator, Iterable, List
 
 from restfly.iterator import APIIterator
 
+from .projection import Projection, project
+
 
 class CrowdstrikeAssetIterator(APIIterator):
+    """
+    An iterator to handle the pagination of the device scroll endpoint, returning
+    the device details of each page of device ids.
+
+    The iterator is pipelined:  once a page of device ids has been returned, the
+    next scroll call is made in the background while the details of the current
+    ids are collected.  The ids are split into chunks of ``_chunk_size`` and the
+    details of each chunk are requested concurrently.  The scroll and detail calls
+    share a pool of ``_max_workers`` threads, so no more than ``_max_workers``
+    requests are ever in flight.
+
+    The pool is shut down (and any pending calls cancelled) once the iterator is
+    exhausted, fails, or is closed.  Callers that stop iterating early should call
+    `close`, although the pool is also shut down when the iterator is garbage
+    collected.
+    """
+
     _path: str
     _envelope: str
     _params: Dict[str, Any]
     _offset: str | None = None
     _total_assets: int | None = None
+    _chunk_size: int = 5000
+    _max_workers: int = 4
+    _executor: ThreadPoolExecutor | None = None
+    _scroll: Future | None = None
 
-    def _get_page(self):
+    def _scroll_page(self, offset: str | None) -> Dict[str, Any]:
+        """
+        Gets the page of device ids following the offset.
+        """
         params = copy(self._params)
-        if self._offset:
-            params['offset'] = self._offset
-        # params['skip'] = self._page_size * self.num_pages
-        # params['top'] = self._page_size
-        resp = self._api.get(self._path, params=params)
+        if offset:
+            params['offset'] = offset
+        return self._api.get(self._path, params=params)
+
+    def _details(self, ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Gets the device details for the ids, requesting each chunk of ids
+        concurrently.  The details are returned in the order of the chunks.
+        """
+        chunks = [
+            ids[idx : idx + self._chunk_size]
+            for idx in range(0, len(ids), self._chunk_size)
+        ]
+        jobs = [
+            self._executor.submit(self._api.assets._device_details, ids=chunk)
+            for chunk in chunks
+        ]
+        page = []
+        for job in jobs:
+            page.extend(job.result()[self._envelope])
+        return page
+
+    def close(self) -> None:
+        """
+        Shuts down the worker pool without waiting for it, cancelling any calls
+        that haven't started yet.
+        """
+        self._scroll = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __del__(self):
+        self.close()
+
+    def _stop(self):
+        self.close()
+        raise StopIteration()
+
+    def _get_page(self):
+        try:
+            self._next_page()
+        except BaseException:
+            self.close()
+            raise
+
+    def _next_page(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers)
+            self._scroll = self._executor.submit(self._scroll_page, self._offset)
+        if self._scroll is None:
+            self._stop()
+        resp = self._scroll.result()
         pagination = resp.get('meta').get('pagination')
         self._offset = pagination.get('offset', None)
         if self._total_assets is None:
@@ -25,9 +101,14 @@ class CrowdstrikeAssetIterator(APIIterator):
             self._log.info(f'Total assets reported by api: {self._total_assets}')
         device_ids = resp[self._envelope]
         if len(device_ids) == 0:
-            raise StopIteration()
-        resp = self._api.assets._device_details(ids=device_ids)
-        self.page = resp[self._envelope]
+            self._stop()
+
+        # Request the next page of device ids while the details are collected.
+        # Without an offset there is no next page to scroll to.
+        self._scroll = None
+        if self._offset:
+            self._scroll = self._executor.submit(self._scroll_page, self._offset)
+        self.page = self._details(device_ids)
 
 
 class CrowdstrikeFindingIterator(APIIterator):
@@ -39,15 +120,23 @@ class CrowdstrikeFindingIterator(APIIterator):
     _envelope: str
     _params: Dict[str, Any]
     _after: str | None = None
+    _fields: Projection | None = None
 
     def _get_page(self):
         """
-        Get the next page of findings
+        Get the next page of findings.  If a projection has been set, the page is
+        decoded into plain dictionaries and reduced to the projected fields.
         """
         if self._after:
             self._params['after'] = self._after
 
-        resp = self._api.get(self._path, params=self._params)
+        if self._fields is None:
+            resp = self._api.get(self._path, params=self._params)
+        else:
+            resp = self._api.get(
+                self._path, params=self._params, box=False, conv_json=True
+            )
+            resp[self._envelope] = project(resp.get(self._envelope, []), self._fields)
         pagination = resp.get('meta').get('pagination')
         self._after = pagination.get('after')
         if not self.total:
@@ -55,3 +144,62 @@ class CrowdstrikeFindingIterator(APIIterator):
             self.total = pagination.get('total')
             self._log.info(f'Total findings reported by api: {self.max_items}')
         self.page = resp.get(self._envelope, [])
+
+
+def merge_iterators(
+    iterators: Iterable[Iterable[Any]],
+    buffer_size: int = 5000,
+) -> Generator[Any, None, None]:
+    """
+    Consumes each of the iterators within its own thread and yields their items as
+    they arrive.  The order of the items across the iterators is not preserved.
+    Should any of the iterators fail, the remaining ones are stopped and the error
+    is raised to the caller.
+
+    Args:
+        iterators: The iterators to merge
+        buffer_size: How many items may be buffered before the threads are paused
+    """
+    iterators = list(iterators)
+    queue = Queue(maxsize=buffer_size)
+    stop = threading.Event()
+    finished = object()
+
+    def put(item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def drain(iterator: Iterable[Any]) -> None:
+        try:
+            for item in iterator:
+                if not put(item):
+                    return
+        except Exception as err:
+            put(err)
+        finally:
+            put(finished)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, len(iterators)))
+    for iterator in iterators:
+        executor.submit(drain, iterator)
+    running = len(iterators)
+    try:
+        while running:
+            try:
+                item = queue.get(timeout=0.1)
+            except Empty:
+                continue
+            if item is finished:
+                running -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,38 @@
+"""
+Response field projection.
+
+The Spotlight vulnerability records carry far more detail than the connector uses
+(CVE descriptions, references, remediation details, etc.).  A projection describes
+the fields to keep as a nested mapping, where ``None`` keeps the value as-is and a
+nested mapping projects the value (or each item of a list value) in turn.  The
+records are projected as soon as each page is decoded, so only the kept fields are
+held in memory for the rest of the sync.
+
+Example:
+    >>> project({'id': 1, 'cve': {'id': 'CVE-1', 'description': '...'}},
+    ...         {'id': None, 'cve': {'id': None}})
+    {'id': 1, 'cve': {'id': 'CVE-1'}}
+"""
+
+from typing import Any, Mapping
+
+Projection = Mapping[str, 'Projection | None']
+
+
+def project(value: Any, fields: Projection) -> Any:
+    """
+    Returns the value reduced to the fields within the projection.
+
+    Args:
+        value: The decoded record (or list of records) to project
+        fields: The projection to apply
+    """
+    if isinstance(value, list):
+        return [project(item, fields) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {
+        key: value[key] if spec is None else project(value[key], spec)
+        for key, spec in fields.items()
+        if key in value
+    }
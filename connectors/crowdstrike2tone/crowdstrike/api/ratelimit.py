@@ -0,0 +1,129 @@
+"""
+Falcon API rate limiting.
+
+Every Falcon API response reports the client's request quota through the
+``X-RateLimit-Limit`` (requests per minute) and ``X-RateLimit-Remaining`` headers,
+and a throttled (429) response reports when requests may resume through the
+``X-RateLimit-RetryAfter`` header (an epoch timestamp).  The token bucket within
+this module is kept in sync with those headers and paces the requests of every
+thread sharing the session.  The bucket only holds a second's worth of the quota
+(see ``burst``), so that the quota is spent evenly instead of being exhausted in a
+burst and then waited out.
+"""
+
+import logging
+import threading
+import time
+from typing import Mapping
+
+log = logging.getLogger('crowdstrike.ratelimit')
+
+
+def _header(headers: Mapping[str, str], name: str) -> float | None:
+    try:
+        return float(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    Token bucket refilled at the Falcon API's per-minute request limit.
+
+    Args:
+        limit:
+            The number of requests allowed per period until the API has told us
+            what the client's limit is.
+        period: The length (in seconds) of the rate limit period.
+        burst:
+            How many seconds' worth of the quota may be spent at once, i.e. the
+            capacity of the bucket (at least one request).
+        max_wait: The longest that we will ever wait before the next request.
+
+    Example:
+        >>> limiter = RateLimiter()
+        >>> limiter.acquire()
+        >>> resp = session.get(...)
+        >>> limiter.update(resp.headers, resp.status_code)
+    """
+
+    limit: float
+    period: float
+    burst: float
+    max_wait: float
+
+    def __init__(
+        self,
+        limit: float = 6000,
+        period: float = 60,
+        burst: float = 1,
+        max_wait: float = 300,
+    ):
+        self.limit = limit
+        self.period = period
+        self.burst = burst
+        self.max_wait = max_wait
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._not_before = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> float:
+        """
+        The most tokens that the bucket holds.
+        """
+        return max(1.0, self.limit / self.period * self.burst)
+
+    def _refill(self, now: float) -> None:
+        rate = self.limit / self.period
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * rate)
+        self._updated = now
+
+    def acquire(self) -> None:
+        """
+        Blocks until a request may be made and takes a token from the bucket.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._not_before and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(
+                    self._not_before - now,
+                    (1 - self._tokens) * self.period / self.limit,
+                )
+            wait = min(wait, self.max_wait)
+            if wait >= 1:
+                log.info(f'Waiting {wait:.1f}s for the Falcon rate limit')
+            time.sleep(wait)
+
+    def update(self, headers: Mapping[str, str], status: int | None = None) -> None:
+        """
+        Synchronizes the bucket with the rate limit headers of a response.
+
+        Args:
+            headers: The response headers
+            status: The response status code
+        """
+        limit = _header(headers, 'X-RateLimit-Limit')
+        remaining = _header(headers, 'X-RateLimit-Remaining')
+        retry_after = _header(headers, 'X-RateLimit-RetryAfter')
+        with self._lock:
+            self._refill(time.monotonic())
+            if limit and limit != self.limit:
+                log.debug(f'Falcon rate limit is {limit:.0f} requests per minute')
+                self.limit = limit
+            if remaining is not None:
+                # The API is the authority on how much of the quota is left, as
+                # other clients may share it.
+                self._tokens = min(self._tokens, remaining)
+            if status == 429:
+                self._tokens = 0
+                wait = self.period / self.limit
+                if retry_after is not None:
+                    wait = max(wait, retry_after - time.time())
+                wait = min(wait, self.max_wait)
+                self._not_before = max(self._not_before, time.monotonic() + wait)
@@ -5,8 +5,10 @@ from box import Box, BoxList
 
 from .assets import AssetsAPI
 from .findings import FindingsAPI
+from .ratelimit import RateLimiter
 
 import os
+import threading
 import arrow
 
 
@@ -41,8 +43,28 @@ class CrowdStrikeAPI(APISession):
         if not kwargs.get('client_secret'):
             raise ConnectionError('No valid client_secret provided')
 
+        self._auth_lock = threading.RLock()
+        self.limiter = RateLimiter()
         super().__init__(**kwargs)
 
+    def _build_session(self, **kwargs) -> None:
+        super()._build_session(**kwargs)
+        self._session.hooks['response'].append(self._update_rate_limit)
+
+    def _update_rate_limit(self, resp: Response, *args, **kwargs) -> None:
+        """
+        Response hook feeding the rate limit headers of every response (including
+        the retried ones) into the rate limiter.
+        """
+        self.limiter.update(resp.headers, resp.status_code)
+
+    def _retry_request(self, response: Response, retries: int, **kwargs) -> dict:
+        """
+        Paces the retries of throttled requests through the rate limiter.
+        """
+        self.limiter.acquire()
+        return kwargs
+
     def _authenticate(self, **kwargs) -> None:
         if not self.client_id:
             self.client_id = kwargs.get('client_id')
@@ -76,14 +98,19 @@ class CrowdStrikeAPI(APISession):
     ) -> Union[Box, BoxList, Response, Dict, List, None]:
         """
         Overload default request function to ensure we update our token before it expires
+        and that the request is paced by the rate limiter.
         """
-        if (
-            self.token_expires_at
-            and arrow.utcnow().int_timestamp >= self.token_expires_at
-        ):
-            self.token_expires_at = None
-            self._authenticate()
+        # The asset iterator makes calls from several threads, so only the first
+        # thread to notice that the token has expired re-authenticates.
+        with self._auth_lock:
+            if (
+                self.token_expires_at
+                and arrow.utcnow().int_timestamp >= self.token_expires_at
+            ):
+                self.token_expires_at = None
+                self._authenticate()
 
+        self.limiter.acquire()
         return super()._req(method, path, **kwargs)
 
     @property
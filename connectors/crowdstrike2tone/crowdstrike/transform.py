@@ -7,6 +7,7 @@ from restfly.utils import trunc
 from tenable.io import TenableIO
 
 from . import __version__ as version
+from .api.findings import FINDING_FIELDS
 from .api.session import CrowdStrikeAPI
 
 
@@ -43,6 +44,9 @@ class Transformer:
         self,
         get_findings: bool = True,
         last_seen_days: int = 1,
+        since: int | None = None,
+        since_overlap: int = 3600,
+        finding_shards: int = 1,
     ) -> dict[str, dict[str, int]]:
         """
         Main entry point for the transformer.
@@ -52,14 +56,28 @@ class Transformer:
                 Should we import findings into T1 as well?
             last_seen_days (int):
                 The number of days to go back when collecting assets and findings.
+            since (int):
+                The timestamp of the last successful run.  If set, only the assets
+                seen and the findings updated since then are collected instead of
+                the last ``last_seen_days`` days.
+            since_overlap (int):
+                How many seconds before ``since`` to start collecting from, so that
+                records ingested by Falcon late are still picked up.
+            finding_shards (int):
+                How many time slices of the findings window to collect
+                concurrently.  A value of 1 collects them as a single stream.
 
         Returns:
             dict: The counts of assets and findings imported.
         """
+        if since is not None:
+            since = arrow.get(since).shift(seconds=-since_overlap)
+            self.log.info(f'Collecting the assets and findings changed since {since}')
         job = self.tvm.sync.create(sync_id='tenable_crowdstrike_falcon')
         with job:
             # Process the assets
-            for asset in self.crwd.assets.list(last_seen_days=last_seen_days):
+            assets = self.crwd.assets.list(last_seen_days=last_seen_days, since=since)
+            for asset in assets:
                 t1asset = self.transform_asset(asset)
                 self.log.debug('Adding asset id=%s to the job' % t1asset['id'])
                 job.add(t1asset, object_type='device-asset')
@@ -68,7 +86,20 @@ class Transformer:
 
             # Process the findings
             if get_findings:
-                for vuln in self.crwd.findings.vulns(last_seen_days=last_seen_days):
+                if finding_shards > 1:
+                    vulns = self.crwd.findings.vulns_sharded(
+                        shards=finding_shards,
+                        last_seen_days=last_seen_days,
+                        since=since,
+                        fields=FINDING_FIELDS,
+                    )
+                else:
+                    vulns = self.crwd.findings.vulns(
+                        last_seen_days=last_seen_days,
+                        since=since,
+                        fields=FINDING_FIELDS,
+                    )
+                for vuln in vulns:
                     finding = self.transform_finding(vuln)
                     self.log.debug(
                         'Adding finding id=%s to asset id=%s'
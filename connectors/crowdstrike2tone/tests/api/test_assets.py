@@ -1,7 +1,15 @@
+import json
+import threading
+import time
+
 import arrow
 import pytest
 import responses
 from responses.matchers import json_params_matcher, query_param_matcher
+from restfly.errors import APIError
+
+SCROLL_URL = 'https://nourl.crowdstrike/devices/queries/devices-scroll/v1'
+DETAILS_URL = 'https://nourl.crowdstrike/devices/entities/devices/v2'
 
 
 @responses.activate
@@ -85,3 +93,110 @@ def test_assets_device_details_negative(csapi, asset_details_page):
     )
     with pytest.raises(AttributeError):
         csapi.assets._device_details(ids=ids)
+
+
+@responses.activate
+def test_assets_list_pipelined(
+    csapi, asset_id_page_one, asset_id_page, asset_details_page
+):
+    scroll_url = 'https://nourl.crowdstrike/devices/queries/devices-scroll/v1'
+    details_url = 'https://nourl.crowdstrike/devices/entities/devices/v2'
+    asset_id_page_one['resources'] = ['1', '2', '3']
+    first = responses.get(
+        url=scroll_url,
+        match=[query_param_matcher({'limit': 5000}, strict_match=False)],
+        json=asset_id_page_one,
+    )
+    last = responses.get(
+        url=scroll_url,
+        match=[query_param_matcher({'offset': 'example_offset'}, strict_match=False)],
+        json=asset_id_page,
+    )
+    chunks = [
+        responses.post(
+            url=details_url,
+            match=[json_params_matcher({'ids': ids})],
+            json=asset_details_page,
+        )
+        for ids in (['1', '2'], ['3'])
+    ]
+    assets = list(csapi.assets.list(chunk_size=2, max_workers=2))
+    assert len(assets) == 2 * len(asset_details_page['resources'])
+    assert first.call_count == 1
+    assert last.call_count == 1
+    assert all(chunk.call_count == 1 for chunk in chunks)
+
+
+@responses.activate
+def test_assets_list_in_flight(
+    csapi, asset_id_page_one, asset_id_page, asset_details_page
+):
+    asset_id_page_one['resources'] = ['1', '2', '3', '4']
+    lock = threading.Lock()
+    active, peak = [0], [0]
+
+    def tracked(body):
+        def callback(request):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return 200, {'Content-Type': 'application/json'}, json.dumps(body)
+
+        return callback
+
+    responses.add_callback(
+        responses.GET,
+        SCROLL_URL,
+        tracked(asset_id_page),
+        match=[query_param_matcher({'offset': 'example_offset'}, strict_match=False)],
+    )
+    responses.add_callback(responses.GET, SCROLL_URL, tracked(asset_id_page_one))
+    responses.add_callback(responses.POST, DETAILS_URL, tracked(asset_details_page))
+    assets = list(csapi.assets.list(chunk_size=1, max_workers=2))
+    assert len(assets) == 4 * len(asset_details_page['resources'])
+    # The background scroll call counts towards the max_workers bound.
+    assert peak[0] == 2
+
+
+@responses.activate
+@pytest.mark.parametrize('failing', ['scroll', 'details'])
+def test_assets_list_error_closes_pool(csapi, asset_id_page_one, failing):
+    if failing == 'scroll':
+        responses.get(SCROLL_URL, status=400)
+    else:
+        responses.get(SCROLL_URL, json=asset_id_page_one)
+        responses.post(DETAILS_URL, status=400)
+    assets = csapi.assets.list()
+    with pytest.raises(APIError):
+        list(assets)
+    assert assets._executor._shutdown
+
+
+@responses.activate
+def test_assets_list_close(csapi, asset_id_page_one, asset_details_page):
+    responses.get(SCROLL_URL, json=asset_id_page_one)
+    responses.post(DETAILS_URL, json=asset_details_page)
+    assets = csapi.assets.list()
+    next(assets)
+    assets.close()
+    assert assets._executor._shutdown
+    assert assets._scroll is None
+
+
+@responses.activate
+def test_assets_list_since(csapi, asset_id_page):
+    scroll = responses.get(
+        url='https://nourl.crowdstrike/devices/queries/devices-scroll/v1',
+        match=[
+            query_param_matcher(
+                {'filter': "last_seen:>='2024-12-03T14:01:27+0000'"},
+                strict_match=False,
+            )
+        ],
+        json=asset_id_page,
+    )
+    assert list(csapi.assets.list(since=1733234487, last_seen_days=7)) == []
+    assert scroll.call_count == 1
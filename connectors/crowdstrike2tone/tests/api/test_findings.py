@@ -1,7 +1,22 @@
+from contextlib import contextmanager
+from unittest import mock
+
 import arrow
+import pytest
 import responses
 from responses.matchers import query_param_matcher
 
+from crowdstrike.api.findings import FINDING_FIELDS, time_slices
+from crowdstrike.api.iterator import merge_iterators
+
+FMT = 'YYYY-MM-DDTHH:mm:ssZ'
+
+
+@contextmanager
+def freeze_now(now: str):
+    with mock.patch('arrow.utcnow', return_value=arrow.get(now)):
+        yield
+
 
 @responses.activate
 def test_findings_vulns_without_filter(csapi, finding_details_page, last_seen_days=1):
@@ -49,3 +64,99 @@ def test_findings_vulns_with_filter(csapi, finding_details_page, last_seen_days=
     resp = csapi.findings.vulns(limit=6000, last_seen_days=last_seen_days)
     for item in resp:
         assert isinstance(item, dict)
+
+
+@responses.activate
+def test_findings_vulns_since(csapi, finding_details_page):
+    responses.get(
+        url='https://nourl.crowdstrike/spotlight/combined/vulnerabilities/v1',
+        match=[
+            query_param_matcher(
+                {
+                    'filter': (
+                        'updated_timestamp:>"2024-12-03T14:01:27+0000"'
+                        '+status:["open","reopen"]'
+                    ),
+                },
+                strict_match=False,
+            )
+        ],
+        json=finding_details_page,
+    )
+    resp = csapi.findings.vulns(since=1733234487, last_seen_days=7)
+    for item in resp:
+        assert isinstance(item, dict)
+
+
+@responses.activate
+def test_findings_vulns_projection(csapi, finding_details_page, finding_details):
+    url = 'https://nourl.crowdstrike/spotlight/combined/vulnerabilities/v1'
+    responses.get(
+        url=url,
+        match=[
+            query_param_matcher({'facet': ['cve', 'remediation']}, strict_match=False)
+        ],
+        json=finding_details_page,
+    )
+    vulns = list(
+        csapi.findings.vulns(facets=['cve', 'remediation'], fields=FINDING_FIELDS)
+    )
+    assert vulns[0]['cve'] == {'id': 'CVE-2024-50222', 'severity': 'HIGH'}
+    assert 'suppression_info' not in vulns[0]
+    assert 'remediation' not in vulns[0]['apps'][0]
+
+    vulns = list(csapi.findings.vulns(facets=['cve', 'remediation']))
+    assert vulns[0] == finding_details
+    assert vulns[0].cve.id == 'CVE-2024-50222'
+
+
+def test_time_slices():
+    start = arrow.get('2024-12-03T00:00:00.500000+00:00')
+    end = arrow.get('2024-12-03T00:00:10+00:00')
+    slices = time_slices(start, end, 3)
+    assert [(a.second, b.second) for a, b in slices] == [(0, 3), (3, 6), (6, 10)]
+    assert time_slices(start, start, 4) == [(start.floor('second'),) * 2]
+
+
+@responses.activate
+def test_findings_vulns_sharded(csapi, finding_details_page, finding_details):
+    url = 'https://nourl.crowdstrike/spotlight/combined/vulnerabilities/v1'
+    other = dict(finding_details, id='897581')
+    pages = {
+        '2024-12-03T00:00:00+0000': [finding_details],
+        '2024-12-03T12:00:00+0000': [other],
+    }
+    for since, resources in pages.items():
+        responses.get(
+            url=url,
+            match=[
+                query_param_matcher(
+                    {
+                        'filter': (
+                            f'updated_timestamp:>"{since}"+status:["open","reopen"]'
+                            f'+updated_timestamp:<="'
+                            f'{arrow.get(since).shift(hours=12).format(FMT)}"'
+                        )
+                    },
+                    strict_match=False,
+                )
+            ],
+            json={
+                'meta': {'pagination': {'total': len(resources)}},
+                'resources': resources,
+            },
+        )
+    with freeze_now('2024-12-04T00:00:00+00:00'):
+        vulns = list(
+            csapi.findings.vulns_sharded(shards=2, since='2024-12-03T00:00:00+00:00')
+        )
+    assert sorted(v['id'] for v in vulns) == ['897580', '897581']
+
+
+def test_merge_iterators_error():
+    def failing():
+        yield 1
+        raise ValueError('shard failed')
+
+    with pytest.raises(ValueError, match='shard failed'):
+        list(merge_iterators([iter([1, 2]), failing()]))
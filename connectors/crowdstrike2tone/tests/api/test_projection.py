@@ -0,0 +1,18 @@
+from crowdstrike.api.projection import project
+
+
+def test_project():
+    record = {
+        'id': 1,
+        'apps': [{'name': 'a', 'remediation': {}}, {'name': 'b'}],
+        'cve': {'id': 'CVE-1', 'description': 'something'},
+        'host_info': {'hostname': 'example'},
+    }
+    fields = {'id': None, 'apps': {'name': None}, 'cve': {'id': None}, 'x': None}
+    assert project(record, fields) == {
+        'id': 1,
+        'apps': [{'name': 'a'}, {'name': 'b'}],
+        'cve': {'id': 'CVE-1'},
+    }
+    assert project([record], {'id': None}) == [{'id': 1}]
+    assert project({'cve': None}, {'cve': {'id': None}}) == {'cve': None}
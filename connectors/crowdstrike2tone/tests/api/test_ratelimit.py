@@ -0,0 +1,92 @@
+import time
+
+import responses
+
+from crowdstrike.api.ratelimit import RateLimiter
+
+
+def test_ratelimit_bucket(monkeypatch):
+    clock = [1000.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(time, 'monotonic', lambda: clock[0])
+    monkeypatch.setattr(time, 'sleep', sleep)
+    limiter = RateLimiter(limit=60, period=60)
+    limiter.update({'X-RateLimit-Limit': '120', 'X-RateLimit-Remaining': '1'})
+    assert limiter.limit == 120
+    limiter.acquire()
+    assert sleeps == []
+    # The bucket is empty and refills at 2 tokens per second.
+    limiter.acquire()
+    assert sleeps == [0.5]
+
+
+def test_ratelimit_burst(monkeypatch):
+    clock = [1000.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(time, 'monotonic', lambda: clock[0])
+    monkeypatch.setattr(time, 'sleep', sleep)
+    # 120 requests a minute with a 5 second burst leaves room for 10 at once.
+    limiter = RateLimiter(limit=120, period=60, burst=5)
+    assert limiter.capacity == 10
+    for _ in range(10):
+        limiter.acquire()
+    assert sleeps == []
+    limiter.acquire()
+    assert sleeps == [0.5]
+    # An idle period never refills the bucket past its capacity.
+    clock[0] += 3600
+    limiter.update({})
+    assert limiter._tokens == 10
+
+
+def test_ratelimit_retry_after():
+    limiter = RateLimiter(limit=6000)
+    limiter.update({'X-RateLimit-RetryAfter': str(time.time() + 30)}, status=429)
+    assert limiter._tokens == 0
+    assert 29 < limiter._not_before - time.monotonic() <= 30
+
+
+def test_ratelimit_max_wait():
+    limiter = RateLimiter(max_wait=5)
+    limiter.update({'X-RateLimit-RetryAfter': str(time.time() + 3600)}, status=429)
+    assert limiter._not_before - time.monotonic() <= 5
+
+
+@responses.activate
+def test_session_rate_limit_headers(csapi, asset_details_page):
+    responses.post(
+        url='https://nourl.crowdstrike/devices/entities/devices/v2',
+        json=asset_details_page,
+        headers={'X-RateLimit-Limit': '100', 'X-RateLimit-Remaining': '42'},
+    )
+    csapi.assets._device_details(ids=['1'])
+    assert csapi.limiter.limit == 100
+    assert csapi.limiter._tokens <= 42
+
+
+@responses.activate
+def test_session_rate_limit_retry(csapi, asset_details_page, monkeypatch):
+    waits = []
+    monkeypatch.setattr(csapi.limiter, 'acquire', lambda: waits.append(1))
+    monkeypatch.setattr(time, 'sleep', lambda s: None)
+    url = 'https://nourl.crowdstrike/devices/entities/devices/v2'
+    responses.post(
+        url=url,
+        status=429,
+        headers={'X-RateLimit-RetryAfter': str(int(time.time()) + 1)},
+    )
+    responses.post(url=url, json=asset_details_page)
+    resp = csapi.assets._device_details(ids=['1'])
+    assert resp['resources']
+    # One for the request, and one for the retry.
+    assert len(waits) == 2
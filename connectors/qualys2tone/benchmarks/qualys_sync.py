@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Measures the end-to-end throughput of the Qualys connector.
+
+A synthetic Qualys tenant is served from a local stub of the Qualys API and each
+stage of the connector is run against it: the raw asset and detection streams
+(``xml_handler``), the knowledgebase cache (``cache_knowledgebase``) and a full
+``Transformer.run`` into a stub sync job.  Usage:
+
+    python -m benchmarks.qualys_sync --hosts 2000 --detections 20 --page-size 500
+"""
+
+import argparse
+import resource
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from qualys.api import QualysAPI
+from qualys.transform import Transformer
+
+from .stub import QualysStub, StubTVM
+from .synthetic import Dataset
+
+
+def peak_rss() -> float:
+    """
+    Returns the peak resident set size of the process in MiB.
+    """
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def stage(name: str, func: Callable[[], dict[str, int]]) -> dict[str, Any]:
+    """
+    Runs a single benchmark stage and reports the throughput of every counter that
+    the stage returned.
+    """
+    started = time.perf_counter()
+    counters = func()
+    elapsed = time.perf_counter() - started
+    rates = ', '.join(f'{v} {k} ({v / elapsed:.0f}/s)' for k, v in counters.items())
+    print(f'{name:>20}: {elapsed:7.2f}s  {rates}  peak_rss={peak_rss():.0f}MiB')
+    return {'seconds': elapsed, 'peak_rss': peak_rss(), **counters}
+
+
+def count_hosts(hosts) -> dict[str, int]:
+    counters = {'hosts': 0, 'detections': 0}
+    for host in hosts:
+        counters['hosts'] += 1
+        counters['detections'] += len(host.get('detections', []))
+    return counters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--hosts', type=int, default=1000)
+    parser.add_argument('--detections', type=int, default=20)
+    parser.add_argument('--qids', type=int, default=5000)
+    parser.add_argument('--cves', type=int, default=3)
+    parser.add_argument('--bare-every', type=int, default=0)
+    parser.add_argument('--page-size', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0)
+    parser.add_argument('--engine', choices=['pydantic', 'fast'], default='fast')
+    parser.add_argument('--prefetch', action='store_true')
+    parser.add_argument('--single-pass', action='store_true')
+    parser.add_argument('--lazy-kbs', action='store_true')
+    parser.add_argument('--detection-shards', type=int, default=1)
+    parser.add_argument('--no-validate', action='store_true')
+    args = parser.parse_args()
+
+    dataset = Dataset(
+        hosts=args.hosts,
+        detections=args.detections,
+        qids=args.qids,
+        cves=args.cves,
+        bare_every=args.bare_every,
+    )
+    opts = {'engine': args.engine, 'prefetch': args.prefetch}
+    page = {'page_size': args.page_size}
+    print(f'dataset: {dataset}')
+
+    with (
+        QualysStub(dataset, latency=args.latency) as url,
+        tempfile.TemporaryDirectory() as tmp,
+    ):
+        qualys = QualysAPI(url=url, username='bench', password='bench')
+        stage(
+            'assets xml_handler',
+            lambda: count_hosts(qualys.assets.vuln(**page, **opts)),
+        )
+        stage(
+            'detect xml_handler',
+            lambda: count_hosts(qualys.findings.vuln(**page, **opts)),
+        )
+
+        transformer = Transformer(
+            db_uri=f'sqlite:///{Path(tmp) / "cache.db"}',
+            tvm=StubTVM(validate=not args.no_validate),
+            qualys=qualys,
+            xml_engine=args.engine,
+            prefetch=args.prefetch,
+            detection_shards=args.detection_shards,
+        )
+
+        def cache_kbs():
+            transformer.cache_knowledgebase()
+            return {'kbs': len(transformer.kb)}
+
+        stage('cache_knowledgebase', cache_kbs)
+
+        def run():
+            counts = transformer.run(
+                lazy_kbs=args.lazy_kbs, single_pass=args.single_pass
+            )
+            return {k: v['sent'] for k, v in counts.items() if 'sent' in v}
+
+        stage('Transformer.run', run)
+
+
+if __name__ == '__main__':
+    main()
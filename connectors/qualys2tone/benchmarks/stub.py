@@ -0,0 +1,192 @@
+"""
+Local stubs of the Qualys API and the Tenable One sync job.
+
+The Qualys stub serves the synthetic dataset from the asset, detection and
+knowledgebase endpoints, honouring the paging (``truncation_limit`` & ``id_min``),
+``id_max`` and ``ids`` parameters that the connector uses.  It runs within its own
+process so that generating the responses doesn't compete with the connector for
+the GIL or skew the peak RSS measurements.
+"""
+
+import multiprocessing
+import time
+from collections import defaultdict
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Iterable
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from tenable.io.sync.models.cve_finding import CVEFinding
+from tenable.io.sync.models.device_asset import DeviceAsset
+
+from . import synthetic
+from .synthetic import QID_BASE, Dataset
+
+BASE_PATH = '/api/2.0/fo'
+
+
+def _ids(value: str) -> set[int]:
+    """
+    Parses a Qualys ids parameter (comma separated ids and ranges).
+    """
+    ids = set()
+    for item in value.split(','):
+        start, _, end = item.partition('-')
+        ids.update(range(int(start), int(end or start) + 1))
+    return ids
+
+
+class QualysHandler(BaseHTTPRequestHandler):
+    """
+    Request handler serving the synthetic dataset.
+    """
+
+    dataset: Dataset
+    latency: float
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        path = url.path.removeprefix(BASE_PATH).strip('/')
+        ds = self.dataset
+        if path == 'asset/host':
+            kind = 'assets'
+            ids = range(1, ds.hosts + 1)
+            render = partial(synthetic.host, ds=ds, detections=False)
+        elif path == 'asset/host/vm/detection':
+            kind = 'detections'
+            ids = (i for i in range(1, ds.hosts + 1) if ds.has_detections(i))
+            render = partial(synthetic.host, ds=ds)
+        elif path == 'knowledge_base/vuln':
+            kind = 'knowledgebase'
+            ids = range(QID_BASE, QID_BASE + ds.qids)
+            render = partial(synthetic.vuln, ds=ds)
+        else:
+            self.send_error(404)
+            return
+        body = self.render_page(kind, ids, render, url.path, params)
+        time.sleep(self.latency)
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/xml')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('X-RateLimit-Remaining', '300')
+        self.send_header('X-Concurrency-Limit-Limit', '5')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def render_page(
+        self,
+        kind: str,
+        ids: Iterable[int],
+        render: Callable[[int], str],
+        path: str,
+        params: dict[str, str],
+    ) -> bytes:
+        """
+        Renders the page of records selected by the query parameters.
+        """
+        limit = int(params.get('truncation_limit', 1000)) or None
+        id_min = int(params.get('id_min', 0))
+        id_max = int(params['id_max']) if 'id_max' in params else None
+        wanted = _ids(params['ids']) if 'ids' in params else None
+        records, next_id = [], None
+        for rid in ids:
+            if rid < id_min or (id_max is not None and rid > id_max):
+                continue
+            if wanted is not None and rid not in wanted:
+                continue
+            if limit and len(records) >= limit:
+                next_id = rid
+                break
+            records.append(render(rid))
+        next_url = None
+        if next_id is not None:
+            host, port = self.server.server_address[:2]
+            query = urlencode({**params, 'id_min': next_id})
+            next_url = f'http://{host}:{port}{path}?{query}'
+        return synthetic.page(kind, records, next_url)
+
+
+def _serve(dataset: Dataset, latency: float, conn) -> None:
+    handler = type(
+        'Handler', (QualysHandler,), {'dataset': dataset, 'latency': latency}
+    )
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    conn.send(server.server_address[1])
+    server.serve_forever()
+
+
+class QualysStub:
+    """
+    Runs the Qualys stub server within a child process.
+
+    Args:
+        dataset: The synthetic dataset to serve
+        latency: Seconds to wait before answering each request
+
+    Example:
+        >>> with QualysStub(Dataset(hosts=100)) as url:
+        ...     qualys = QualysAPI(url=url, username='user', password='pass')
+    """
+
+    def __init__(self, dataset: Dataset, latency: float = 0):
+        self.dataset = dataset
+        self.latency = latency
+        self.process = None
+
+    def __enter__(self) -> str:
+        parent, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_serve, args=(self.dataset, self.latency, child), daemon=True
+        )
+        self.process.start()
+        return f'http://127.0.0.1:{parent.recv()}'
+
+    def __exit__(self, *args) -> None:
+        self.process.terminate()
+        self.process.join()
+
+
+class StubJob:
+    """
+    Stands in for the pyTenable sync JobManager.  Objects are counted (and
+    validated against the sync models unless disabled) instead of uploaded.
+    """
+
+    sync_id = 'tenable_qualys_vm'
+    uuid = '00000000-0000-0000-0000-000000000000'
+    object_map = {'device-asset': DeviceAsset, 'cve-finding': CVEFinding}
+
+    def __init__(self, validate: bool = True):
+        self.validate = validate
+        self.counters = defaultdict(lambda: {'accepted': 0})
+
+    def __enter__(self) -> 'StubJob':
+        return self
+
+    def __exit__(self, *args) -> None:
+        pass
+
+    def add(self, object: dict[str, Any], object_type: str) -> None:
+        if self.validate:
+            self.object_map[object_type](**object)
+        self.counters[object_type]['accepted'] += 1
+
+
+class StubTVM:
+    """
+    Minimal TenableIO stand-in exposing ``sync.create``.
+    """
+
+    def __init__(self, validate: bool = True):
+        self.sync = self
+        self.validate = validate
+        self.jobs = []
+
+    def create(self, sync_id: str) -> StubJob:
+        job = StubJob(validate=self.validate)
+        self.jobs.append(job)
+        return job
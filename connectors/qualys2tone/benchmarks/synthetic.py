@@ -0,0 +1,158 @@
+"""
+Synthetic Qualys XML generator.
+
+Builds realistic HOST_LIST, HOST_LIST_VM_DETECTION and KNOWLEDGE_BASE_VULN_LIST
+responses of a configurable size for the benchmarks.  Every record is derived from
+its id, so any page can be generated on its own without holding the whole dataset.
+"""
+
+from typing import Iterable, NamedTuple
+
+QID_BASE = 100000
+
+HOST = """
+<HOST>
+  <ID>{id}</ID>
+  <ASSET_ID>{id}</ASSET_ID>
+  <IP>10.0.{a}.{b}</IP>
+  <TRACKING_METHOD>IP</TRACKING_METHOD>
+  <OS><![CDATA[Red Hat Enterprise Linux 8.0]]></OS>
+  <LAST_VM_SCANNED_DATE>2023-08-10T13:23:13Z</LAST_VM_SCANNED_DATE>
+  <TAGS><TAG><TAG_ID>1</TAG_ID><NAME><![CDATA[TagName]]></NAME></TAG></TAGS>
+  <DETECTION_LIST>{detections}</DETECTION_LIST>
+</HOST>
+"""
+
+DETECTION = """
+<DETECTION>
+  <UNIQUE_VULN_ID>{id}</UNIQUE_VULN_ID>
+  <QID>{qid}</QID>
+  <TYPE>Confirmed</TYPE>
+  <SEVERITY>{severity}</SEVERITY>
+  <SSL>0</SSL>
+  <RESULTS><![CDATA[Package   Installed Version   Required Version]]></RESULTS>
+  <STATUS>Active</STATUS>
+  <FIRST_FOUND_DATETIME>2023-08-10T11:50:56Z</FIRST_FOUND_DATETIME>
+  <LAST_FOUND_DATETIME>2023-08-10T13:23:13Z</LAST_FOUND_DATETIME>
+  <QDS severity="HIGH">72</QDS>
+  <QDS_FACTORS>
+    <QDS_FACTOR name="CVSS"><![CDATA[9.8]]></QDS_FACTOR>
+    <QDS_FACTOR name="epss"><![CDATA[0.2054]]></QDS_FACTOR>
+  </QDS_FACTORS>
+  <TIMES_FOUND>2</TIMES_FOUND>
+  <LAST_TEST_DATETIME>2023-08-10T13:23:13Z</LAST_TEST_DATETIME>
+  <LAST_UPDATE_DATETIME>2023-08-10T13:45:17Z</LAST_UPDATE_DATETIME>
+  <IS_IGNORED>0</IS_IGNORED>
+  <IS_DISABLED>0</IS_DISABLED>
+  <LAST_PROCESSED_DATETIME>2023-08-10T13:45:17Z</LAST_PROCESSED_DATETIME>
+</DETECTION>
+"""
+
+
+VULN = """
+<VULN>
+  <QID>{qid}</QID>
+  <VULN_TYPE>Vulnerability</VULN_TYPE>
+  <SEVERITY_LEVEL>{severity}</SEVERITY_LEVEL>
+  <TITLE><![CDATA[Synthetic Vulnerability {qid}]]></TITLE>
+  <CATEGORY>Local</CATEGORY>
+  <LAST_SERVICE_MODIFICATION_DATETIME>2024-08-01T02:22:29Z</LAST_SERVICE_MODIFICATION_DATETIME>
+  <PUBLISHED_DATETIME>2024-07-01T00:00:00Z</PUBLISHED_DATETIME>
+  <PATCHABLE>1</PATCHABLE>
+  <CVE_LIST>{cves}</CVE_LIST>
+  <DIAGNOSIS><![CDATA[A synthetic vulnerability used for benchmarking.]]></DIAGNOSIS>
+  <PCI_FLAG>1</PCI_FLAG>
+  <DISCOVERY><REMOTE>0</REMOTE></DISCOVERY>
+</VULN>
+"""
+
+CVE = '<CVE><ID>CVE-2024-{id:05d}</ID><URL>https://nvd.nist.gov/</URL></CVE>'
+
+WARNING = """
+<WARNING>
+  <CODE>1980</CODE>
+  <TEXT>{count} record limit exceeded. Use URL to get next batch of results.</TEXT>
+  <URL><![CDATA[{url}]]></URL>
+</WARNING>
+"""
+
+ROOTS = {
+    'assets': ('HOST_LIST_OUTPUT', 'HOST_LIST'),
+    'detections': ('HOST_LIST_VM_DETECTION_OUTPUT', 'HOST_LIST'),
+    'knowledgebase': ('KNOWLEDGE_BASE_VULN_LIST_OUTPUT', 'VULN_LIST'),
+}
+
+
+class Dataset(NamedTuple):
+    """
+    Describes the size of the synthetic Qualys tenant.
+
+    Args:
+        hosts: Number of hosts (host ids start at 1)
+        detections: Number of detections per host
+        qids: Number of QIDs within the knowledgebase
+        cves: Number of CVEs per QID
+        bare_every: Every n-th host has no detections (0 to disable)
+    """
+
+    hosts: int = 1000
+    detections: int = 20
+    qids: int = 5000
+    cves: int = 3
+    bare_every: int = 0
+
+    def has_detections(self, host_id: int) -> bool:
+        return not (self.bare_every and host_id % self.bare_every == 0)
+
+
+def detection(host_id: int, index: int, ds: Dataset) -> str:
+    """
+    Generates the index-th detection of the host.
+    """
+    uid = host_id * ds.detections + index
+    qid = QID_BASE + uid % ds.qids
+    return DETECTION.format(id=uid, qid=qid, severity=qid % 5 + 1)
+
+
+def host(host_id: int, ds: Dataset, detections: bool = True) -> str:
+    """
+    Generates the host record, optionally including its detection list.
+    """
+    dets = ''
+    if detections:
+        dets = ''.join(detection(host_id, i, ds) for i in range(ds.detections))
+    return HOST.format(
+        id=host_id, a=host_id // 256 % 256, b=host_id % 256, detections=dets
+    )
+
+
+def vuln(qid: int, ds: Dataset) -> str:
+    """
+    Generates the knowledgebase record of the QID.
+    """
+    cves = ''.join(CVE.format(id=(qid * ds.cves + i) % 100000) for i in range(ds.cves))
+    return VULN.format(qid=qid, severity=qid % 5 + 1, cves=cves)
+
+
+def page(kind: str, records: Iterable[str], next_url: str | None = None) -> bytes:
+    """
+    Wraps the records into a response page of the given kind (``assets``,
+    ``detections`` or ``knowledgebase``).  If a next URL is given, a paging
+    WARNING is appended to the response.
+    """
+    root, container = ROOTS[kind]
+    records = list(records)
+    warning = WARNING.format(count=len(records), url=next_url) if next_url else ''
+    return (
+        f'<{root}><RESPONSE><DATETIME>2024-08-01T02:22:29Z</DATETIME>'
+        f'<{container}>{"".join(records)}</{container}>{warning}'
+        f'</RESPONSE></{root}>'
+    ).encode()
+
+
+def detection_page(hosts: int, detections: int) -> bytes:
+    """
+    Generates a single detection page with the requested number of records.
+    """
+    ds = Dataset(hosts=hosts, detections=detections, qids=detections)
+    return page('detections', (host(hid, ds) for hid in range(1, hosts + 1)))
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Compares the throughput of the XML parse engines.
+
+A synthetic HOST_LIST_VM_DETECTION page is generated in memory and then parsed with
+both the default (pydantic) engine and the fast (lxml) engine.  Usage:
+
+    python -m benchmarks.xml_parsing --hosts 500 --detections 20
+"""
+
+import argparse
+import time
+from functools import partial
+from io import BytesIO
+
+from qualys.api import fastparse, streaming
+from qualys.api.models.asset import Host
+
+from .synthetic import detection_page
+
+
+def measure(parser, data: bytes) -> tuple[int, float]:
+    """
+    Parses the page and returns the number of detections and elapsed seconds.
+    """
+    count = 0
+    started = time.perf_counter()
+    for host in parser(BytesIO(data), Host, 'HOST', {}):
+        count += len(host.get('detections', []))
+    return count, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--hosts', type=int, default=500)
+    parser.add_argument('--detections', type=int, default=20)
+    args = parser.parse_args()
+
+    data = detection_page(args.hosts, args.detections)
+    print(f'page size: {len(data) / 1024 / 1024:.1f} MiB')
+    results = {}
+    for name, func in (
+        ('pydantic', streaming.parse_page),
+        ('fast', fastparse.parse_page),
+        ('compact', partial(fastparse.parse_page, compact=True)),
+    ):
+        count, elapsed = measure(func, data)
+        results[name] = count / elapsed
+        print(
+            f'{name:>8}: {count} detections in {elapsed:.2f}s ({results[name]:.0f}/s)'
+        )
+    print(f' speedup: {results["fast"] / results["pydantic"]:.1f}x (fast)')
+    print(f' speedup: {results["compact"] / results["pydantic"]:.1f}x (compact)')
+
+
+if __name__ == '__main__':
+    main()
@@ -22,6 +22,11 @@ class LogLevels(str, Enum):
     error = 'ERROR'
 
 
+class KBStores(str, Enum):
+    memory = 'memory'
+    mmap = 'mmap'
+
+
 def setup_logging(log_level: LogLevels) -> None:
     """
     Setup logging for qualys integration
@@ -67,13 +72,41 @@ def run(
         LogLevels, Option(envvar='LOG_LEVEL', help='Output logging level')
     ] = 'INFO',
     cache_file: Annotated[Path, Option(help='Local cache file')] = Path('cache.db'),
-    flush_cache: Annotated[bool, Option(help='Flush any cache that exists?')] = True,
+    flush_cache: Annotated[bool, Option(help='Flush any cache that exists?')] = False,
     download_kbs: Annotated[
         bool, Option(help='Download the Qualys knowledgebase?')
     ] = True,
     download_vulns: Annotated[
         bool, Option(help='Download the Qualys Findings?')
     ] = True,
+    lazy_kbs: Annotated[
+        bool, Option(help='Only download the KBs for QIDs that were detected?')
+    ] = False,
+    kb_cache_size: Annotated[
+        int | None,
+        Option(help='Max QIDs to hold in memory (LRU). Defaults to the whole KB.'),
+    ] = None,
+    kb_store: Annotated[
+        KBStores, Option(help='Serve the KB lookups from memory or a mapped file?')
+    ] = KBStores.memory,
+    prefetch: Annotated[
+        bool, Option(help='Download the next Qualys page while parsing the current?')
+    ] = False,
+    detection_shards: Annotated[
+        int, Option(help='Concurrent host id ranges to download detections for.')
+    ] = 1,
+    incremental: Annotated[
+        bool, Option(help='Only sync what changed since the last successful run?')
+    ] = False,
+    single_pass: Annotated[
+        bool, Option(help='Derive the assets from the detection host records?')
+    ] = False,
+    spool_dir: Annotated[
+        Path | None, Option(help='Spool the raw Qualys pages to this directory')
+    ] = None,
+    resume: Annotated[
+        bool, Option(help='Resume from the pages spooled by a failed run?')
+    ] = False,
 ) -> None:
     """
     Run the Qualys integration
@@ -95,8 +128,24 @@ def run(
     qualys = QualysAPI(
         url=qualys_url, username=qualys_username, password=qualys_password
     )
-    q2t1 = Transformer(tvm=tvm, qualys=qualys, db_uri=f'sqlite:///{cache_file}')
-    q2t1.run(get_kbs=download_kbs, get_findings=download_vulns)
+    q2t1 = Transformer(
+        tvm=tvm,
+        qualys=qualys,
+        db_uri=f'sqlite:///{cache_file}',
+        kb_cache_size=kb_cache_size,
+        kb_store=kb_store.value,
+        prefetch=prefetch,
+        detection_shards=detection_shards,
+        spool_dir=spool_dir,
+        resume=resume,
+    )
+    q2t1.run(
+        get_kbs=download_kbs,
+        get_findings=download_vulns,
+        lazy_kbs=lazy_kbs,
+        incremental=incremental,
+        single_pass=single_pass,
+    )
 
 
 if __name__ == '__main__':
@@ -44,6 +44,16 @@ class AppSettings(Settings):
             ),
         ),
     ] = True
+    incremental: Annotated[
+        bool,
+        Field(
+            title='Incremental Sync',
+            description=(
+                'Only import the hosts and detections that changed since the last '
+                'successful run'
+            ),
+        ),
+    ] = False
 
 
 connector = Connector(
@@ -58,7 +68,11 @@ def main(config: AppSettings, since: int | None = None):
     Qualys to Tenable One Connector
     """
     transformer = Transformer()
-    counts = transformer.run(get_findings=config.import_findings)
+    counts = transformer.run(
+        get_findings=config.import_findings,
+        since=since if config.incremental else None,
+        incremental=config.incremental,
+    )
     return {'counts': counts}
 
 
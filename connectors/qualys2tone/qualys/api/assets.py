@@ -2,14 +2,14 @@
 Asset Handling API Module for Qualys
 """
 
-from typing import Optional
+from typing import Any, Generator, Iterable, Optional
 
-import arrow
 from arrow.arrow import Arrow
 from restfly.endpoint import APIEndpoint
 
-from .models.asset import Host
+from .models.asset import Host, HostInventory
 from .streaming import xml_handler
+from .utils import since_param
 
 
 class AssetsAPI(APIEndpoint):
@@ -20,6 +20,7 @@ class AssetsAPI(APIEndpoint):
         compliance_enabled: bool,
         page_size: Optional[int] = 10000,
         since: Optional[Arrow | str] = None,
+        ids: Optional[Iterable[int]] = None,
         **kwargs,
     ) -> xml_handler:
         """
@@ -31,6 +32,10 @@ class AssetsAPI(APIEndpoint):
             since (Arrow|str, optional):
                 An arrow object or time string to pull data since.
                 If None we pull api default.
+            ids (list[int], optional): Only return the hosts with these host ids.
+            **kwargs:
+                Any additional keyword arguments are passed on to the xml_handler
+                (e.g. ``engine``).
         Returns:
             QualysIterator
         Docs:
@@ -52,18 +57,20 @@ class AssetsAPI(APIEndpoint):
             'truncation_limit': page_size,
             'compliance_enabled': 1 if compliance_enabled else None,
         }
+        if ids is not None:
+            params['ids'] = ','.join(str(i) for i in ids)
 
         if since is not None:
             # TODO check if we can move to detection_ since from vulns api
             # format YYYY-MM-DD[THH:MM:SSZ]
             if compliance_enabled:
                 # Set compliance data since param
-                params['compliance_scan_since'] = arrow.get(since).isoformat()
+                params['compliance_scan_since'] = since_param(since)
             else:
                 # set vuln data since param
-                params['vm_scan_since'] = arrow.get(since).isoformat()
+                params['vm_scan_since'] = since_param(since)
 
-        return xml_handler(self._api, self._path, params, Host, 'HOST')
+        return xml_handler(self._api, self._path, params, Host, 'HOST', **kwargs)
 
     def vuln(self, since: Optional[Arrow | str] = None, **kwargs) -> xml_handler:
         """
@@ -78,6 +85,59 @@ class AssetsAPI(APIEndpoint):
         """
         return self._list(compliance_enabled=False, since=since, **kwargs)
 
+    def vuln_by_ids(
+        self,
+        ids: Iterable[int],
+        chunk_size: int = 1000,
+        **kwargs,
+    ) -> Generator[dict[str, Any], None, None]:
+        """
+        Get only the requested hosts, querying the host ids in chunks so that the
+        request URLs stay within a reasonable length.
+
+        Args:
+            ids: The host ids to collect.
+            chunk_size: How many host ids should be requested in each call.
+            **kwargs: Passed on to the `vuln` method.
+
+        Returns:
+            Generator
+        """
+        ids = sorted(set(ids))
+        for idx in range(0, len(ids), chunk_size):
+            yield from self.vuln(ids=ids[idx : idx + chunk_size], **kwargs)
+
+    def inventory(
+        self,
+        since: Optional[Arrow | str] = None,
+        page_size: int = 10000,
+        **kwargs,
+    ) -> xml_handler:
+        """
+        Get the id and the inventory fields (serial number, hardware uuid, first
+        found date & agent status) of every host last seen with vuln findings.  The
+        detection endpoint doesn't return these fields, so they are collected here
+        to complete the host records of the detection endpoint.  None of the extra
+        tag, ARS or TruRisk details of `vuln` are requested.
+
+        Args:
+            since optional(Arrow:str):
+                An arrow object or time string to pull data since. If None we pull
+                api default.
+            page_size (int, optional): the page size we want to download
+        Returns:
+            QualysIterator
+        """
+        params = {
+            'action': 'list',
+            'truncation_limit': page_size,
+        }
+        if since is not None:
+            params['vm_scan_since'] = since_param(since)
+        return xml_handler(
+            self._api, self._path, params, HostInventory, 'HOST', **kwargs
+        )
+
     def compliance(self, since: Optional[Arrow | str] = None, **kwargs) -> xml_handler:
         """
         Get all hosts last seen with compliance findings
@@ -85,9 +145,9 @@ class AssetsAPI(APIEndpoint):
         Args:
             since optional(Arrow:str):
                 An arrow object or time string to pull data
-                since. If None we pull api default.
+                since. If None we pull api default.  Filters on the host's last
+                compliance scan (``compliance_scan_since``).
         Returns:
             QualysIterator
         """
-        raise NotImplementedError('This feature has not been implemented yet.')
-        # return self._list(compliance_enabled=True,since=since, **kwargs)
+        return self._list(compliance_enabled=True, since=since, **kwargs)
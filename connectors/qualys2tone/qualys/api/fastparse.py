@@ -0,0 +1,269 @@
+"""
+Fast-path XML parse engine.
+
+The default streaming engine serializes every matched element back into a string
+and then re-parses that string through the Pydantic XML model.  While this is
+memory efficient, each record ends up being parsed twice.  This engine instead
+walks the element tree that lxml has already built for us and constructs the
+dictionaries directly, using a field mapping that is derived (once per model) from
+the very same Pydantic XML models.  The resulting dictionaries match the output of
+``model.from_xml(...).model_dump(exclude_none=True)`` for the models within this
+package.
+
+Only light validation is performed:  scalar values are coerced to the annotated
+type and required fields must be present.  Anything more involved should use the
+default engine.
+
+When ``compact`` is enabled, the models listed within ``COMPACT_RECORDS`` are
+converted into their slotted record types instead, skipping every field that the
+record doesn't hold.  The detections are by far the most numerous records within a
+sync, so this saves a dictionary (and ~30 field values) for each of them.
+"""
+
+import types
+import typing
+from datetime import datetime
+from functools import cache
+from typing import IO, Any, Callable, Generator
+
+from lxml.etree import iterparse
+from pydantic_xml import BaseXmlModel, RootXmlModel
+
+from .models.findings import Detection, DetectionRecord
+from .models.response import Warning
+
+
+class FieldSpec(typing.NamedTuple):
+    name: str
+    convert: Callable[[str], Any] | None
+    model: type[BaseXmlModel] | None
+    is_list: bool
+
+
+class ModelSpec(typing.NamedTuple):
+    elements: dict[str, FieldSpec]
+    attributes: dict[str, FieldSpec]
+    text: FieldSpec | None
+    required: frozenset[str]
+    is_root: bool
+
+
+def _to_bool(value: str) -> bool:
+    value = value.strip().lower()
+    if value in ('1', 'true'):
+        return True
+    if value in ('0', 'false'):
+        return False
+    raise ValueError(f'{value!r} is not a valid boolean')
+
+
+CONVERTERS = {
+    bool: _to_bool,
+    int: lambda v: int(v.strip()),
+    float: lambda v: float(v.strip()),
+    datetime: lambda v: datetime.fromisoformat(v.strip()),
+    str: str,
+}
+
+
+COMPACT_RECORDS = {Detection: DetectionRecord}
+
+
+def _entity(field) -> tuple[str | None, str | None]:
+    """
+    Returns the xml entity location name and path for the model field.  Depending
+    on the version of pydantic-xml, this information is either stored on the field
+    itself or within the field metadata.
+    """
+    for info in (field, *field.metadata):
+        if hasattr(info, 'location'):
+            location = info.location.name if info.location else None
+            return location, info.path
+    return None, None
+
+
+def _unwrap(annotation) -> tuple[Any, bool]:
+    """
+    Strips any optional wrappers from the annotation and returns the remaining type
+    along with whether the type is a list.
+    """
+    origin = typing.get_origin(annotation)
+    if origin in (typing.Union, types.UnionType):
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        return _unwrap(args[0])
+    if origin is list:
+        return typing.get_args(annotation)[0], True
+    return annotation, False
+
+
+@cache
+def model_spec(model: type[BaseXmlModel]) -> ModelSpec:
+    """
+    Builds the tag -> field mapping for the given Pydantic XML model.
+    """
+    elements, attributes, required = {}, {}, set()
+    text = None
+    for name, field in model.model_fields.items():
+        location, path = _entity(field)
+        ftype, is_list = _unwrap(field.annotation)
+        submodel = (
+            ftype
+            if isinstance(ftype, type) and issubclass(ftype, BaseXmlModel)
+            else None
+        )
+        spec = FieldSpec(
+            name=name,
+            convert=None if submodel else CONVERTERS.get(ftype, str),
+            model=submodel,
+            is_list=is_list,
+        )
+        if field.is_required():
+            required.add(name)
+        if location == 'ATTRIBUTE':
+            attributes[path or name] = spec
+        elif submodel:
+            elements[path or submodel.__xml_tag__] = spec
+        elif location == 'ELEMENT':
+            elements[path or name] = spec
+        else:
+            text = spec
+    return ModelSpec(
+        elements=elements,
+        attributes=attributes,
+        text=text,
+        required=frozenset(required),
+        is_root=issubclass(model, RootXmlModel),
+    )
+
+
+@cache
+def record_fields(model: type[BaseXmlModel]) -> dict[str, FieldSpec]:
+    """
+    Returns the tag -> field mapping of the model's fields held by its compact
+    record type.
+    """
+    slots = COMPACT_RECORDS[model].__slots__
+    return {
+        tag: field
+        for tag, field in model_spec(model).elements.items()
+        if field.name in slots
+    }
+
+
+def to_record(elem, model: type[BaseXmlModel]) -> Any:
+    """
+    Converts the element into the compact record type of the model.
+
+    Args:
+        elem: The lxml element to convert
+        model: The Pydantic XML model describing the element
+    """
+    fields = record_fields(model)
+    values = {}
+    for child in elem:
+        field = fields.get(child.tag)
+        if field is not None and child.text:
+            values[field.name] = field.convert(child.text)
+    missing = (
+        model_spec(model)
+        .required.intersection(COMPACT_RECORDS[model].__slots__)
+        .difference(values)
+    )
+    if missing:
+        raise ValueError(
+            f'{model.__name__} is missing the required fields: {sorted(missing)}'
+        )
+    return COMPACT_RECORDS[model](**values)
+
+
+def _value(elem, spec: FieldSpec, compact: bool = False) -> Any:
+    """
+    Converts the element into the value for the field.
+    """
+    if spec.model:
+        return to_dict(elem, spec.model, compact=compact)
+    if elem.text is None or elem.text == '':
+        return None
+    return spec.convert(elem.text)
+
+
+def to_dict(elem, model: type[BaseXmlModel], compact: bool = False) -> Any:
+    """
+    Converts the element into the same structure as the model would have dumped
+    with ``exclude_none=True``.
+
+    Args:
+        elem: The lxml element to convert
+        model: The Pydantic XML model describing the element
+        compact: Convert any nested models with a compact record type into records.
+    """
+    if compact and model in COMPACT_RECORDS:
+        return to_record(elem, model)
+    spec = model_spec(model)
+    data = {}
+    for child in elem:
+        field = spec.elements.get(child.tag)
+        if field is None:
+            continue
+        value = _value(child, field, compact)
+        if value is None:
+            continue
+        if field.is_list:
+            data.setdefault(field.name, []).append(value)
+        elif field.name not in data:
+            data[field.name] = value
+    for key, field in spec.attributes.items():
+        value = elem.get(key)
+        if value is not None:
+            data[field.name] = field.convert(value)
+    if spec.text and elem.text:
+        data[spec.text.name] = spec.text.convert(elem.text)
+    if spec.is_root:
+        return data.get('root')
+    missing = spec.required.difference(data)
+    if missing:
+        raise ValueError(
+            f'{model.__name__} is missing the required fields: {sorted(missing)}'
+        )
+    return data
+
+
+def parse_page(
+    source: IO[bytes],
+    model: type[BaseXmlModel],
+    tag: str,
+    page: dict[str, Any],
+    compact: bool = False,
+) -> Generator[dict[str, Any], None, None]:
+    """
+    Stream-parses a single page of results with lxml.
+
+    Args:
+        source: The file-like object to parse
+        model: PydanticXML model to use for the field mapping
+        tag: The XML tag that represents a single record
+        page:
+            Dictionary to store the page metadata in.  The ``next_url`` key will
+            be set if a WARNING with a URL was found.
+        compact: Produce compact records for the models that support them.
+    """
+    events = iterparse(
+        source,
+        events=('end',),
+        tag=(tag, 'WARNING'),
+        resolve_entities=False,
+        no_network=True,
+    )
+    for _, elem in events:
+        if elem.tag == 'WARNING':
+            page['next_url'] = to_dict(elem, Warning).get('url')
+        else:
+            yield to_dict(elem, model, compact=compact)
+        # Release the processed element along with any preceding siblings that
+        # are still attached to the parent so that the tree doesn't grow with
+        # the size of the page.
+        elem.clear(keep_tail=True)
+        parent = elem.getparent()
+        if parent is not None:
+            while elem.getprevious() is not None:
+                del parent[0]
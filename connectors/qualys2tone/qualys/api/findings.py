@@ -2,13 +2,35 @@
 Finding/Vulnerability handling API module for Qualys
 """
 
-from typing import List, Literal
+from typing import Any, Generator, Iterable, List, Literal
 
-import arrow
 from restfly.endpoint import APIEndpoint
 
 from .models.asset import Host
-from .streaming import xml_handler
+from .models.compliance import Posture
+from .streaming import merge_stats, merge_streams, xml_handler
+from .utils import since_param
+
+
+def id_ranges(ids: Iterable[int], shards: int) -> list[tuple[int | None, int | None]]:
+    """
+    Splits the host ids into contiguous ranges of roughly equal host counts.  The
+    first and last ranges are left open-ended so that any hosts created after the
+    ids were collected are still covered.
+
+    Args:
+        ids: The host ids to split
+        shards: How many ranges to return (at most)
+
+    Returns:
+        A list of ``(id_min, id_max)`` tuples.  ``None`` denotes an open bound.
+    """
+    ids = sorted(set(ids))
+    shards = max(1, min(shards, len(ids)))
+    bounds = sorted({ids[len(ids) * i // shards] for i in range(1, shards)})
+    starts = [None, *bounds]
+    ends = [b - 1 for b in bounds] + [None]
+    return list(zip(starts, ends, strict=True))
 
 
 class FindingsAPI(APIEndpoint):
@@ -24,6 +46,8 @@ class FindingsAPI(APIEndpoint):
         severities: List[Literal[1, 2, 3, 4, 5]] | None = None,
         filter_superseded_qids: bool = True,
         page_size: int = 10000,
+        id_min: int | None = None,
+        id_max: int | None = None,
         **kwargs,
     ) -> xml_handler:
         """
@@ -48,6 +72,11 @@ class FindingsAPI(APIEndpoint):
                 the results.
             page_size (int, optional):
                 How many records should be included in each page we download
+            id_min (int, optional): Only include hosts with an id at or above this
+            id_max (int, optional): Only include hosts with an id at or below this
+            **kwargs:
+                Any additional keyword arguments are passed on to the xml_handler
+                (e.g. ``engine``).
 
         Docs:
             page 552
@@ -78,8 +107,12 @@ class FindingsAPI(APIEndpoint):
         }
 
         if since is not None:
-            params['detection_updated_since'] = arrow.get(since).isoformat()
-        return xml_handler(self._api, self._path, params, Host, tag='HOST')
+            params['detection_updated_since'] = since_param(since)
+        if id_min is not None:
+            params['id_min'] = id_min
+        if id_max is not None:
+            params['id_max'] = id_max
+        return xml_handler(self._api, self._path, params, Host, tag='HOST', **kwargs)
 
     def vuln(self, since: int | None = None, **kwargs) -> xml_handler:
         """
@@ -96,20 +129,96 @@ class FindingsAPI(APIEndpoint):
 
         return self._list(compliance_enabled=False, since=since, **kwargs)
 
-    def compliance(self, since: int | None = None, **kwargs) -> xml_handler:
+    def vuln_sharded(
+        self,
+        host_ids: Iterable[int],
+        shards: int = 2,
+        since: int | None = None,
+        **kwargs,
+    ) -> Generator[dict[str, Any], None, None]:
         """
-        Get all compliance findings
+        Get all vuln findings, splitting the hosts into id ranges and downloading
+        each range concurrently.  Qualys limits the number of concurrent API calls
+        per subscription (commonly 2 to 5), so the number of shards should be kept
+        at or below that limit.
 
         Args:
-            page_size (int): The page size we want to download
+            host_ids:
+                The host ids to build the ranges from (e.g. the ids seen from
+                `AssetsAPI.vuln`).
+            shards: How many ranges to download concurrently
             since optional(Arrow:str):
                 An arrow object or time string to pull data since. If None we pull
                 api default.
+            **kwargs:
+                Passed on to each shard's xml_handler.  If a ``stats`` dictionary
+                is passed, the metrics of every shard are added to it once the
+                download has completed.
         Returns:
-            QualysIterator
+            Generator of the merged host records
         """
-        raise NotImplementedError('This feature hasnt been implemented yet')
-        # return self._list(compliance_enabled=True,
-        #                  since=since,
-        #                  **kwargs
-        #                  )
+        stats = kwargs.pop('stats', None)
+        streams, shard_stats = [], []
+        for id_min, id_max in id_ranges(host_ids, shards):
+            shard_stats.append({})
+            streams.append(
+                self._list(
+                    compliance_enabled=False,
+                    since=since,
+                    id_min=id_min,
+                    id_max=id_max,
+                    stats=shard_stats[-1],
+                    **kwargs,
+                )
+            )
+        yield from merge_streams(streams)
+        if stats is not None:
+            for shard in shard_stats:
+                merge_stats(stats, shard)
+
+    def compliance(
+        self,
+        policy_ids: Iterable[int],
+        since: int | None = None,
+        host_ids: Iterable[int] | None = None,
+        page_size: int = 10000,
+        **kwargs,
+    ) -> Generator[dict[str, Any], None, None]:
+        """
+        Get the compliance posture of every control for the given policies
+
+        Args:
+            policy_ids (list[int]): The compliance policies to collect.
+            since optional(Arrow:str):
+                An arrow object or time string to pull data since.  Only the
+                postures that changed status since then are returned.  If None
+                the full posture is returned.
+            host_ids (list[int], optional):
+                Only return the postures of these hosts (e.g. the hosts returned
+                by `AssetsAPI.compliance` for the same ``since``).
+            page_size (int, optional):
+                How many records should be included in each page we download
+            **kwargs:
+                Any additional keyword arguments are passed on to the xml_handler
+                (e.g. ``engine``).
+        Returns:
+            Generator
+        """
+        params = {
+            'action': 'list',
+            'details': 'None',
+            'truncation_limit': page_size,
+        }
+        if since is not None:
+            params['status_changes_since'] = since_param(since)
+        if host_ids is not None:
+            params['host_ids'] = ','.join(str(i) for i in sorted(set(host_ids)))
+        for policy_id in policy_ids:
+            yield from xml_handler(
+                self._api,
+                'compliance/posture/info/',
+                {**params, 'policy_id': policy_id},
+                Posture,
+                tag='INFO',
+                **kwargs,
+            )
@@ -2,33 +2,84 @@
 Knowledgebase/Plugin handling module for Qualys
 """
 
-import arrow
+from datetime import datetime
+from typing import Any, Generator, Iterable
+
+from arrow.arrow import Arrow
 from restfly.endpoint import APIEndpoint
 
-from .models.knowledgebase import KnowledgebaseVuln
+from .models.knowledgebase import KnowledgebaseCVEs, KnowledgebaseVuln
 from .streaming import xml_handler
+from .utils import since_param
 
 
 class KnowledgeBaseAPI(APIEndpoint):
     _path = 'knowledge_base/vuln/'
 
-    def list(self, since: int | None = None) -> xml_handler:
+    def list(
+        self,
+        since: Arrow | datetime | int | str | None = None,
+        ids: Iterable[int] | None = None,
+        cves_only: bool = False,
+        **kwargs,
+    ) -> xml_handler:
         """
         Collects the list of KNowledgebase articles from Qualys.
 
         Args:
             since:
-                Only collect KBs newer than this date.
+                Only collect KBs modified after this date.  Accepts anything that
+                arrow can parse (timestamp, datetime, ISO string).
+            ids:
+                Only collect the KBs for these QIDs.
+            cves_only:
+                Only parse the QID, modification date, and CVE ids of each KB.  The
+                full KB details are still requested, as the CVE list is only
+                documented for ``details=All``, but the diagnosis, consequence,
+                solution, and reference lists are skipped instead of parsed.
+            **kwargs:
+                Any additional keyword arguments are passed on to the xml_handler
+                (e.g. ``engine``).
 
         Returns:
             Generator
         """
+        last_modified = None if ids else '1999-01-01'
+        if since:
+            last_modified = since_param(since)
         params = {
             'action': 'list',
             'details': 'All',
             'show_disabled_flag': 1,
-            'last_modified_after': arrow.get(since).format('YYYY-MM-DD')
-            if since
-            else '1999-01-01',
+            'last_modified_after': last_modified,
         }
-        return xml_handler(self._api, self._path, params, KnowledgebaseVuln, tag='VULN')
+        if ids:
+            params['ids'] = ','.join(str(i) for i in ids)
+        model = KnowledgebaseCVEs if cves_only else KnowledgebaseVuln
+        return xml_handler(self._api, self._path, params, model, tag='VULN', **kwargs)
+
+    def list_by_ids(
+        self,
+        ids: Iterable[int],
+        chunk_size: int = 1000,
+        cves_only: bool = False,
+        **kwargs,
+    ) -> Generator[dict[str, Any], None, None]:
+        """
+        Collects only the requested KBs from Qualys, querying the QIDs in chunks so
+        that the request URLs stay within a reasonable length.
+
+        Args:
+            ids: The QIDs to collect.
+            chunk_size: How many QIDs should be requested in each call.
+            cves_only: Only request and parse the CVE ids for each KB.
+            **kwargs: Passed on to the `list` method.
+
+        Returns:
+            Generator
+        """
+        ids = sorted(set(ids))
+        for idx in range(0, len(ids), chunk_size):
+            yield from self.list(
+                ids=ids[idx : idx + chunk_size], cves_only=cves_only, **kwargs
+            )
@@ -39,6 +39,19 @@ class TagList(RootXmlModel):
     root: list[Tag] | None = element(default=None)
 
 
+class HostInventory(BaseXmlModel, tag='HOST', search_mode='unordered'):
+    """
+    The host fields that only the asset endpoint returns (the detection endpoint's
+    HOST records lack them).
+    """
+
+    id: int = element(tag='ID')
+    serial_number: str | None = element(tag='SERIAL_NUMBER', default=None)
+    hardware_uuid: str | None = element(tag='HARDWARE_UUID', default=None)
+    first_found_date: datetime | None = element(tag='FIRST_FOUND_DATE', default=None)
+    agent_status: str | None = element(tag='AGENT_STATUS', default=None)
+
+
 class Host(BaseXmlModel, tag='HOST', search_mode='unordered'):
     id: int = element(tag='ID')
     asset_id: int = element(tag='ASSET_ID')
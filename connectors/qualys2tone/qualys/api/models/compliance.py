@@ -0,0 +1,36 @@
+"""
+Compliance posture XML to JSON Transform models for Qualys.
+
+These models are based on a combination of the Qualys DTD documentation
+and our own observations.
+
+https://cdn2.qualys.com/docs/qualys-api-vmpc-xml-dtd-reference.pdf
+"""
+
+from datetime import datetime
+
+from pydantic_xml import BaseXmlModel, element
+
+
+class Criticality(BaseXmlModel, tag='CRITICALITY'):
+    label: str | None = element(tag='LABEL', default=None)
+    value: int | None = element(tag='VALUE', default=None)
+
+
+class Posture(BaseXmlModel, tag='INFO', search_mode='unordered'):
+    id: int = element(tag='ID')
+    host_id: int = element(tag='HOST_ID')
+    control_id: int = element(tag='CONTROL_ID')
+    policy_id: int | None = element(tag='POLICY_ID', default=None)
+    technology_id: int | None = element(tag='TECHNOLOGY_ID', default=None)
+    instance: str | None = element(tag='INSTANCE', default=None)
+    status: str = element(tag='STATUS')
+    posture_modified: datetime | None = element(
+        tag='POSTURE_MODIFIED_DATE', default=None
+    )
+    first_fail: datetime | None = element(tag='FIRST_FAIL_DATE', default=None)
+    last_fail: datetime | None = element(tag='LAST_FAIL_DATE', default=None)
+    first_pass: datetime | None = element(tag='FIRST_PASS_DATE', default=None)
+    last_pass: datetime | None = element(tag='LAST_PASS_DATE', default=None)
+    last_evaluated: datetime | None = element(tag='LAST_EVALUATED_DATE', default=None)
+    criticality: Criticality | None = element(default=None)
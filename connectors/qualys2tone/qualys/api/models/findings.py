@@ -7,6 +7,7 @@ and our own observations.
 https://cdn2.qualys.com/docs/qualys-api-vmpc-xml-dtd-reference.pdf
 """
 
+from collections.abc import Iterator, Mapping
 from datetime import datetime
 
 from pydantic_xml import BaseXmlModel, RootXmlModel, attr, element
@@ -72,3 +73,52 @@ class Detection(BaseXmlModel, tag='DETECTION', search_mode='unordered'):
 
 class DetectionList(RootXmlModel, tag='DETECTION_LIST'):
     root: list[Detection] | None = element(default=None)
+
+
+class DetectionRecord(Mapping):
+    """
+    Compact detection record holding only the fields that the transformer uses.
+
+    The record is a read-only mapping of the dumped `Detection` model (unset
+    fields are absent, as with ``exclude_none=True``), so it can be used in place
+    of the dumped dictionary.  Refer to `qualys.api.fastparse` for how
+    the records are produced.
+    """
+
+    __slots__ = ('id', 'qid', 'status', 'severity', 'first_found', 'last_found')
+    model = Detection
+
+    def __init__(
+        self,
+        id: int | None = None,
+        qid: int | None = None,
+        status: str | None = None,
+        severity: int | None = None,
+        first_found: datetime | None = None,
+        last_found: datetime | None = None,
+    ):
+        self.id = id
+        self.qid = qid
+        self.status = status
+        self.severity = severity
+        self.first_found = first_found
+        self.last_found = last_found
+
+    def __getitem__(self, key: str):
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return (key for key in self.__slots__ if getattr(self, key) is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f'DetectionRecord({self._asdict()})'
+
+    def _asdict(self) -> dict:
+        values = ((key, getattr(self, key)) for key in self.__slots__)
+        return {key: value for key, value in values if value is not None}
@@ -60,3 +60,22 @@ class KnowledgebaseVuln(BaseXmlModel, tag='VULN', search_mode='unordered'):
     diagnosis: str | None = element(tag='DIAGNOSIS', default=None)
     consequence: str | None = element(tag='CONSEQUENCE', default=None)
     solution: str | None = element(tag='SOLUTION', default=None)
+
+
+class CVEId(BaseXmlModel, tag='CVE'):
+    id: str = element(tag='ID')
+
+
+class CVEIdList(RootXmlModel, tag='CVE_LIST'):
+    root: list[CVEId] = element(tag='CVE', default=[])
+
+
+class KnowledgebaseCVEs(BaseXmlModel, tag='VULN', search_mode='unordered'):
+    """
+    Slim projection of the knowledgebase vuln containing only the QID, the
+    modification date, and the CVE ids.  Everything else is skipped by the parser.
+    """
+
+    qid: int = element(tag='QID')
+    last_modified: datetime = element(tag='LAST_SERVICE_MODIFICATION_DATETIME')
+    cves: CVEIdList | None = element(default=None)
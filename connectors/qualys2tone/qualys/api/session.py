@@ -9,6 +9,7 @@ from restfly.session import APISession
 from .assets import AssetsAPI
 from .findings import FindingsAPI
 from .knowledgebase import KnowledgeBaseAPI
+from .throttle import Throttle
 
 
 class QualysAPI(APISession):
@@ -18,6 +19,7 @@ class QualysAPI(APISession):
 
     _base_path = 'api/2.0/fo'
     _box = True
+    throttle: Throttle
 
     """
     Docs:
@@ -47,6 +49,7 @@ class QualysAPI(APISession):
             raise ConnectionError('No valid API URL defined')
         if not (kwargs.get('username') and kwargs.get('password')):
             raise ConnectionError('username and/or password were not provided.')
+        self.throttle = Throttle()
         super().__init__(**kwargs)
 
     def _authenticate(self, username: str, password: str) -> None:
@@ -0,0 +1,116 @@
+"""
+On-disk page spool for the Qualys XML streams.
+
+Each raw page is written to disk (gzip compressed) before it's parsed, along with a
+manifest recording the next page URL of every page.  Should the process die part
+of the way through a long download, a subsequent run can replay the pages that were
+already downloaded and continue from the last unfetched URL instead of starting
+over.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import IO, Any
+
+
+class PageSpool:
+    """
+    Stores the raw pages of a single Qualys stream.
+
+    Every stream (the combination of the API path and query parameters) is stored
+    within its own sub-directory of the spool directory, so several streams can
+    share the same spool directory.
+
+    Args:
+        directory: The spool directory
+        path: The API path of the stream
+        params: The query parameters of the first page of the stream
+    """
+
+    directory: Path
+    manifest_file: Path
+    pages: list[dict[str, Any]]
+
+    def __init__(self, directory: str | Path, path: str, params: dict[str, Any]):
+        key = json.dumps([path, params], sort_keys=True, default=str)
+        digest = hashlib.sha1(key.encode(), usedforsecurity=False).hexdigest()
+        self.directory = Path(directory) / digest[:16]
+        self.manifest_file = self.directory / 'manifest.json'
+        self.path = path
+        self.params = params
+        self.pages = []
+        self._lock = threading.Lock()
+
+    @property
+    def next_url(self) -> str | None:
+        """
+        The URL of the first page that hasn't been spooled yet.
+        """
+        return self.pages[-1]['next_url'] if self.pages else None
+
+    def load(self) -> bool:
+        """
+        Loads the manifest of a previous run.  Returns True if any pages were found.
+        """
+        if not self.manifest_file.exists():
+            return False
+        manifest = json.loads(self.manifest_file.read_text())
+        self.pages = manifest['pages']
+        return bool(self.pages)
+
+    def reset(self) -> None:
+        """
+        Removes any previously spooled pages.
+        """
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory.mkdir(parents=True)
+        self.pages = []
+        self._save()
+
+    def _save(self) -> None:
+        """
+        Writes the manifest.  The manifest is written to a temporary file first and
+        then moved into place, so that a crash never leaves a partial manifest.
+        """
+        tmp = self.manifest_file.with_suffix('.tmp')
+        tmp.write_text(
+            json.dumps({'path': self.path, 'params': self.params, 'pages': self.pages})
+        )
+        os.replace(tmp, self.manifest_file)
+
+    def add(self, source: IO[bytes], next_url: str | None) -> None:
+        """
+        Compresses the page into the spool and records it within the manifest.  The
+        source is rewound afterwards so that it can be parsed.
+
+        Args:
+            source: The downloaded page
+            next_url: The URL of the following page (if known)
+        """
+        with self._lock:
+            filename = f'page-{len(self.pages):05d}.xml.gz'
+            with gzip.open(self.directory / filename, 'wb', compresslevel=1) as fobj:
+                shutil.copyfileobj(source, fobj)
+            source.seek(0)
+            self.pages.append({'file': filename, 'next_url': next_url})
+            self._save()
+
+    def update(self, index: int, next_url: str | None) -> None:
+        """
+        Records a next page URL that was only discovered while parsing the page.
+        """
+        with self._lock:
+            if next_url and not self.pages[index]['next_url']:
+                self.pages[index]['next_url'] = next_url
+                self._save()
+
+    def open(self, index: int) -> IO[bytes]:
+        """
+        Opens the spooled page for reading.
+        """
+        return gzip.open(self.directory / self.pages[index]['file'], 'rb')
@@ -9,15 +9,56 @@ handle this kind of transform, even through it required modeling
 as much of the report as we needed.
 """
 
-from time import sleep
-from typing import Any
+import logging
+import os
+import resource
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial
+from pathlib import Path
+from queue import Empty, Full, Queue
+from tempfile import SpooledTemporaryFile
+from typing import IO, Any, Callable, Generator, Iterable, Literal
 
 from defusedxml.ElementTree import iterparse, tostring
 from pydantic_xml import BaseXmlModel
+from requests import Response
 from restfly.errors import APIError
 from restfly.session import APISession
 
+from . import fastparse
 from .models.response import Warning
+from .spool import PageSpool
+from .throttle import Throttle, is_retryable
+
+log = logging.getLogger('qualys.streaming')
+
+# Pages smaller than this are held in memory when prefetched, larger ones are
+# rolled over to disk.
+SPOOL_SIZE = 16 * 1024 * 1024
+
+# How much of the end of a prefetched page is searched for the WARNING element.
+TAIL_SIZE = 64 * 1024
+
+# How many records are parsed between each sample of the RSS within a page.
+RSS_SAMPLE_EVERY = 1000
+
+_PAGE_KIB = os.sysconf('SC_PAGE_SIZE') // 1024 if hasattr(os, 'sysconf') else 4
+
+
+def current_rss() -> int:
+    """
+    Returns the current resident set size of the process in KiB.  Where
+    ``/proc`` isn't available, the peak RSS of the process is returned instead.
+    """
+    try:
+        with open('/proc/self/statm', 'rb') as fobj:
+            return int(fobj.read().split()[1]) * _PAGE_KIB
+    except (OSError, IndexError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
 
 
 def handle_request(
@@ -25,35 +66,290 @@ def handle_request(
     url: str,
     params: dict[str, Any] | None = None,
     retries: int = 5,
-    delay: int = 30,
+    delay: float | None = None,
+    throttle: Throttle | None = None,
 ):
     """
-    Simple retry handler for the XML handler function.
+    Rate-limit aware retry handler for the XML handler function.
+
+    Each call is scheduled through the throttle, which tracks the Qualys rate and
+    concurrency limit headers.  The call holds its concurrency slot until the
+    returned response is closed, so the caller must close it (e.g. ``with resp:``)
+    once the body has been read.  Only transient errors (409, 429 & 5xx) are
+    retried, any other error is raised immediately.
 
     Args:
         api: APISession to use to make the calls
         url: Url path to call for the page
         params: Query parameters to pass with the Url
         retries:
-            Upon receiving a 400 response, how many times
+            Upon receiving a retryable error response, how many times
             to retry the same call.
         delay:
-            How long to wait between failed calls?
+            The base retry delay (doubled for each attempt) to use instead of
+            the wait time that the API and throttle would suggest.
+        throttle:
+            The throttle to schedule the call through.  If left unspecified,
+            the ``throttle`` attribute of the API session is used if it exists.
     """
-    exc = None
-    retry_counter = 0
+    throttle = throttle or getattr(api, 'throttle', None) or Throttle()
+    attempt = 0
     while True:
+        throttle.acquire()
         try:
             resp = api.get(url, params=params, stream=True)
         except APIError as err:
-            exc = err
-            retry_counter += 1
-            if retry_counter > retries:
-                raise APIError(resp=exc.response) from exc
-            sleep(delay)
+            throttle.release()
+            status = getattr(err.response, 'status_code', None)
+            headers = getattr(err.response, 'headers', {})
+            throttle.update(headers)
+            if not is_retryable(status):
+                raise
+            attempt += 1
+            if attempt > retries:
+                raise APIError(resp=err.response) from err
+            if delay is not None:
+                wait = delay * 2 ** (attempt - 1)
+            else:
+                wait = throttle.retry_delay(headers, attempt)
+            log.warning(
+                f'Qualys responded with {status}, retrying in {wait}s '
+                f'(attempt {attempt} of {retries})'
+            )
+            throttle.wait(wait)
+            continue
+        except BaseException:
+            throttle.release()
+            raise
+        throttle.update(resp.headers)
+        resp.raw.decode_content = True
+        _release_on_close(resp, throttle)
+        return resp
+
+
+def _release_on_close(resp: Response, throttle: Throttle) -> None:
+    """
+    Holds the throttle's concurrency slot until the response is closed.  Qualys
+    counts a call as running until the whole response body has been sent, so the
+    slot must outlive the response headers for as long as the body is streamed.
+    """
+    close = resp.close
+    once = threading.Lock()
+
+    def close_and_release() -> None:
+        try:
+            close()
+        finally:
+            if once.acquire(blocking=False):
+                throttle.release()
+
+    resp.close = close_and_release
+
+
+def find_next_url(source: IO[bytes]) -> str | None:
+    """
+    Searches the tail of a downloaded page for the WARNING element and returns the
+    next page URL if one exists.  Qualys emits the WARNING as the last element of
+    the RESPONSE, so there is no need to parse the whole page to find it.  The file
+    position is reset to the beginning of the page afterwards.
+    """
+    size = source.seek(0, 2)
+    source.seek(max(0, size - TAIL_SIZE))
+    tail = source.read()
+    source.seek(0)
+    start = tail.rfind(b'<WARNING>')
+    end = tail.find(b'</WARNING>', start)
+    if start < 0 or end < 0:
+        return None
+    return Warning.from_xml(tail[start : end + 10]).url
+
+
+def download_page(
+    api: APISession,
+    url: str,
+    params: dict[str, Any] | None = None,
+) -> tuple[IO[bytes], str | None]:
+    """
+    Downloads a whole page into a spooled temporary file.
+
+    Args:
+        api: APISession to use to make the calls
+        url: Url path to call for the page
+        params: Query parameters to pass with the Url
+
+    Returns:
+        The spooled page (positioned at the beginning) and the next page URL.
+    """
+    resp = handle_request(api, url, params=params)
+    spool = SpooledTemporaryFile(max_size=SPOOL_SIZE)
+    with resp:
+        shutil.copyfileobj(resp.raw, spool)
+    return spool, find_next_url(spool)
+
+
+class MeteredReader:
+    """
+    File-like wrapper that counts the bytes read from the source along with the
+    time spent waiting for them.
+    """
+
+    __slots__ = ('source', 'bytes', 'seconds')
+
+    def __init__(self, source: IO[bytes]):
+        self.source = source
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def read(self, size: int = -1) -> bytes:
+        started = time.perf_counter()
+        data = self.source.read(size)
+        self.seconds += time.perf_counter() - started
+        self.bytes += len(data)
+        return data
+
+
+def merge_stats(into: dict[str, Any], stats: dict[str, Any]) -> dict[str, Any]:
+    """
+    Adds the streaming metrics of one stream onto another.  Counters and timings
+    are summed while any lists are concatenated.
+    """
+    for key, value in stats.items():
+        if isinstance(value, list):
+            into.setdefault(key, []).extend(value)
         else:
-            resp.raw.decode_content = True
-            return resp
+            into[key] = into.get(key, 0) + value
+    return into
+
+
+def _completed(fn: Callable[..., Any], *args) -> Future:
+    """
+    Runs the function immediately and returns its outcome as a completed future.
+    """
+    future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as err:
+        future.set_exception(err)
+    return future
+
+
+def _pages(
+    api: APISession,
+    path: str,
+    params: dict[str, Any],
+    prefetch: bool,
+    spool: PageSpool | None = None,
+    stats: dict[str, Any] | None = None,
+) -> Generator[tuple[IO[bytes], dict[str, Any]], None, None]:
+    """
+    Generates the page sources to parse along with a page metadata dictionary.
+    Once the caller has finished with a page, the ``next_url`` stored within the
+    page metadata is used to fetch the next page.
+
+    When prefetching, each page is downloaded to a spooled temporary file by a
+    background worker and the download of the next page is started as soon as
+    the current page has been downloaded, so that at most one page is held ahead
+    of the one being parsed.
+
+    When a page spool is provided, any pages already within the spool are replayed
+    first and the download then continues from the last unfetched URL.  Every
+    downloaded page is written to the spool before it's parsed.
+
+    The time spent waiting on each page to become available is added to the
+    ``read_seconds`` of the stats.
+    """
+    stats = stats if stats is not None else {}
+    stats.setdefault('read_seconds', 0.0)
+    if not prefetch and not spool:
+        started = time.perf_counter()
+        resp = handle_request(api, path, params=params)
+        while resp:
+            stats['read_seconds'] += time.perf_counter() - started
+            page = {}
+            with resp:
+                yield resp.raw, page
+            next_url = page.get('next_url')
+            started = time.perf_counter()
+            resp = handle_request(api, next_url) if next_url else None
+        return
+
+    index = 0
+    url, url_params = path, params
+    if spool and spool.pages:
+        for index in range(len(spool.pages)):
+            page = {}
+            with spool.open(index) as source:
+                yield source, page
+            spool.update(index, page.get('next_url'))
+        index += 1
+        url, url_params = spool.next_url, None
+        log.info(f'Replayed {index} spooled pages of {path}')
+        if not url:
+            return
+
+    def fetch(url: str, url_params: dict[str, Any] | None = None):
+        source, next_url = download_page(api, url, url_params)
+        if spool:
+            spool.add(source, next_url)
+        return source, next_url
+
+    with ThreadPoolExecutor(max_workers=1) if prefetch else nullcontext() as executor:
+        submit = executor.submit if prefetch else _completed
+        future = submit(fetch, url, url_params)
+        while future:
+            started = time.perf_counter()
+            source, next_url = future.result()
+            stats['read_seconds'] += time.perf_counter() - started
+            future = submit(fetch, next_url) if next_url and prefetch else None
+            page = {}
+            with source:
+                yield source, page
+            if spool:
+                spool.update(index, page.get('next_url'))
+            index += 1
+            # If the WARNING wasn't found within the tail of the page, we fall back
+            # to the URL that the parser discovered.
+            next_url = next_url or page.get('next_url')
+            if not future and next_url:
+                future = submit(fetch, next_url)
+
+
+def parse_page(
+    source: IO[bytes],
+    model: BaseXmlModel,
+    tag: str,
+    page: dict[str, Any],
+) -> Generator[dict[str, Any], None, None]:
+    """
+    Stream-parses a single page of results through the Pydantic XML model.
+
+    Args:
+        source: The file-like object to parse
+        model: PydanticXML model to use for the transform
+        tag: The XML tag that represents a single record
+        page:
+            Dictionary to store the page metadata in.  The ``next_url`` key will
+            be set if a WARNING with a URL was found.
+    """
+    # As ElementTree has no concept of an element's parent, we track the open
+    # elements ourselves so that each processed record can be detached from its
+    # parent.  Otherwise the (cleared) records would accumulate under the
+    # HOST_LIST/VULN_LIST element for the entire page.
+    stack = []
+    events = iterparse(source, events=('start', 'end'))
+    for event, elem in events:
+        if event == 'start':
+            stack.append(elem)
+            continue
+        stack.pop()
+        if elem.tag == 'WARNING':
+            warning = Warning.from_xml(tostring(elem)).model_dump()
+            page['next_url'] = warning['url']
+        if elem.tag == tag:
+            yield model.from_xml(tostring(elem)).model_dump(exclude_none=True)
+            elem.clear()
+            if stack:
+                stack[-1].remove(elem)
 
 
 def xml_handler(
@@ -62,6 +358,12 @@ def xml_handler(
     params: dict[str, Any],
     model: BaseXmlModel,
     tag: str,
+    engine: Literal['pydantic', 'fast'] = 'pydantic',
+    stats: dict[str, Any] | None = None,
+    prefetch: bool = False,
+    spool_dir: str | Path | None = None,
+    resume: bool = False,
+    compact: bool = False,
 ):
     """
     XML stream parser generator.
@@ -74,22 +376,152 @@ def xml_handler(
         tag:
             The XML tage to use as the root for the pydantic
             model that was passed.
+        engine:
+            The parse engine to use.  ``pydantic`` validates each record through
+            the model, whereas ``fast`` builds the dictionaries directly from the
+            lxml element tree using a field mapping derived from the model.
+        stats:
+            Optional dictionary to record the streaming metrics into.  The number
+            of ``pages``, ``records`` and ``bytes`` processed are counted.  The
+            current RSS (in KiB) is sampled at the start and end of each page
+            (and every `RSS_SAMPLE_EVERY` records in between); the highest sample
+            of each page is appended to ``page_rss`` and its growth over the
+            page's starting RSS to ``page_rss_growth``.  The RSS is that of the
+            whole process, so concurrent streams show up in each other's pages.  The time spent waiting on the API is recorded as
+            ``read_seconds`` and the time spent parsing as ``parse_seconds``.
+        prefetch:
+            Should the next page be downloaded in the background while the
+            current page is being parsed?
+        spool_dir:
+            If set, every raw page is written (compressed) to this directory before
+            it's parsed.  Refer to `qualys.api.spool.PageSpool` for details.
+        resume:
+            Should the pages already within the spool directory be replayed and
+            the download continued from the last unfetched page?  If False, any
+            previously spooled pages for this call are discarded.
+        compact:
+            Should the fast engine return compact, slotted records for the
+            models that support them (e.g. `DetectionRecord` for the
+            detections)?  Ignored by the pydantic engine.
     """
-    next_url = None
-    is_done = False
-
-    resp = handle_request(api, path, params=params)
-    while not is_done:
-        events = iterparse(resp.raw, events=('end',))
-        for _, elem in events:
-            if elem.tag == 'WARNING':
-                warning = Warning.from_xml(tostring(elem)).model_dump()
-                next_url = warning['url']
-            if elem.tag == tag:
-                yield model.from_xml(tostring(elem)).model_dump(exclude_none=True)
-                elem.clear()
-        if next_url:
-            resp = handle_request(api, next_url)
-            next_url = None
-        else:
-            is_done = True
+    if engine == 'fast':
+        parser = partial(fastparse.parse_page, compact=compact)
+    else:
+        parser = parse_page
+    stats = stats if stats is not None else {}
+    stats.setdefault('pages', 0)
+    stats.setdefault('records', 0)
+    stats.setdefault('page_rss', [])
+    stats.setdefault('page_rss_growth', [])
+    stats.setdefault('bytes', 0)
+    stats.setdefault('read_seconds', 0.0)
+    stats.setdefault('parse_seconds', 0.0)
+    done = object()
+    spool = None
+    if spool_dir:
+        spool = PageSpool(spool_dir, path, params)
+        if not (resume and spool.load()):
+            spool.reset()
+    for source, page in _pages(api, path, params, prefetch, spool, stats):
+        reader = MeteredReader(source)
+        records = 0
+        elapsed = 0.0
+        start_rss = peak_rss = current_rss()
+        parsed = parser(reader, model, tag, page)
+        while True:
+            started = time.perf_counter()
+            record = next(parsed, done)
+            elapsed += time.perf_counter() - started
+            if record is done:
+                break
+            records += 1
+            if records % RSS_SAMPLE_EVERY == 0:
+                peak_rss = max(peak_rss, current_rss())
+            yield record
+        peak_rss = max(peak_rss, current_rss())
+        stats['pages'] += 1
+        stats['records'] += records
+        stats['bytes'] += reader.bytes
+        stats['read_seconds'] += reader.seconds
+        stats['parse_seconds'] += elapsed - reader.seconds
+        stats['page_rss'].append(peak_rss)
+        stats['page_rss_growth'].append(peak_rss - start_rss)
+        log.debug(
+            f'Parsed page={stats["pages"]} of {tag} records={records} '
+            f'bytes={reader.bytes} read={reader.seconds:.3f}s '
+            f'parse={elapsed - reader.seconds:.3f}s rss={peak_rss}KiB '
+            f'growth={peak_rss - start_rss}KiB'
+        )
+
+
+def merge_streams(
+    streams: list[Iterable[Any]],
+    max_workers: int | None = None,
+    buffer_size: int = 1000,
+) -> Generator[Any, None, None]:
+    """
+    Consumes several record streams concurrently and yields the records from all of
+    them as they arrive.  Each stream is drained by its own worker thread into a
+    bounded queue, so the workers pause whenever the consumer falls behind.  If any
+    of the streams raises an exception, the remaining workers are stopped and the
+    exception is re-raised to the consumer.  When the consumer fails or stops
+    early, the workers are told to stop without being waited for:  each running
+    stream is closed by its worker as soon as its next record arrives, and the
+    streams that were never started are closed straight away.
+
+    Args:
+        streams: The iterables to consume
+        max_workers:
+            How many streams to consume at the same time.  Defaults to all of them.
+        buffer_size: How many records may be queued ahead of the consumer.
+    """
+    queue = Queue(maxsize=buffer_size)
+    stop = threading.Event()
+    done = object()
+
+    def put(item: Any) -> bool:
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def drain(stream: Iterable[Any]):
+        try:
+            for record in stream:
+                if not put((None, record)):
+                    break
+        except Exception as err:
+            put((err, None))
+        finally:
+            close = getattr(stream, 'close', None)
+            if close:
+                close()
+            put((done, None))
+
+    executor = ThreadPoolExecutor(max_workers=max_workers or len(streams) or 1)
+    jobs = []
+    try:
+        for stream in streams:
+            jobs.append((stream, executor.submit(drain, stream)))
+        remaining = len(streams)
+        while remaining:
+            try:
+                err, record = queue.get(timeout=0.1)
+            except Empty:
+                continue
+            if err is done:
+                remaining -= 1
+            elif err:
+                raise err
+            else:
+                yield record
+    finally:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        for stream, job in jobs:
+            close = getattr(stream, 'close', None)
+            if job.cancelled() and close:
+                close()
@@ -0,0 +1,147 @@
+"""
+Qualys rate & concurrency limit handling.
+
+Every Qualys API response reports the state of the subscription's rate and
+concurrency limits through a set of ``X-RateLimit-*`` and ``X-Concurrency-Limit-*``
+headers.  Instead of sleeping for a fixed period whenever a call fails, the
+throttle within this module records those headers and uses them to decide when the
+next call may be made and how many calls may be in flight at the same time.
+"""
+
+import logging
+import threading
+import time
+from typing import Mapping
+
+log = logging.getLogger('qualys.throttle')
+
+RETRYABLE_STATUSES = (409, 429)
+
+
+def is_retryable(status: int | None) -> bool:
+    """
+    Returns if the response status code denotes a transient error that is worth
+    retrying (concurrency/rate limit conflicts and server-side errors).  Anything
+    else (authentication failures, bad requests, etc.) will fail every time.
+    """
+    return status is not None and (status in RETRYABLE_STATUSES or status >= 500)
+
+
+def _header(headers: Mapping[str, str], name: str) -> int | None:
+    try:
+        return int(headers[name])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class Throttle:
+    """
+    Schedules the Qualys API calls based on the limit headers returned by the API.
+
+    Args:
+        concurrency:
+            The number of concurrent calls to allow until the API has told us what
+            the subscription's concurrency limit is.
+        backoff:
+            The delay (in seconds) to use for retries when the API didn't tell us
+            how long to wait.  The delay doubles for each subsequent retry.
+        max_wait: The longest that we will ever wait before the next call.
+
+    Example:
+        >>> throttle = Throttle()
+        >>> with throttle:
+        ...     resp = session.get(...)
+        ...     throttle.update(resp.headers)
+    """
+
+    concurrency: int
+    backoff: float
+    max_wait: float
+    remaining: int | None = None
+
+    def __init__(
+        self,
+        concurrency: int = 2,
+        backoff: float = 5,
+        max_wait: float = 3600,
+    ):
+        self.concurrency = concurrency
+        self.backoff = backoff
+        self.max_wait = max_wait
+        self._active = 0
+        self._not_before = 0.0
+        self._cond = threading.Condition()
+
+    def __enter__(self) -> 'Throttle':
+        self.acquire()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.release()
+
+    def acquire(self) -> None:
+        """
+        Blocks until a concurrency slot is free and any rate limit wait has elapsed.
+        """
+        with self._cond:
+            while self._active >= self.concurrency:
+                self._cond.wait()
+            self._active += 1
+            wait = self._not_before - time.monotonic()
+        if wait > 0:
+            log.info(f'Waiting {wait:.1f}s for the Qualys rate limit to reset')
+            time.sleep(wait)
+
+    def release(self) -> None:
+        """
+        Frees the concurrency slot taken by `acquire`.
+        """
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    def wait(self, seconds: float) -> None:
+        """
+        Defers any new calls for at least the number of seconds specified.
+        """
+        seconds = min(seconds, self.max_wait)
+        with self._cond:
+            self._not_before = max(self._not_before, time.monotonic() + seconds)
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """
+        Records the limit headers from a Qualys API response.
+
+        Args:
+            headers: The response headers
+        """
+        limit = _header(headers, 'X-Concurrency-Limit-Limit')
+        if limit and limit != self.concurrency:
+            log.debug(f'Qualys concurrency limit is {limit}')
+            with self._cond:
+                self.concurrency = limit
+                self._cond.notify_all()
+        self.remaining = _header(headers, 'X-RateLimit-Remaining')
+        to_wait = _header(headers, 'X-RateLimit-ToWait-Sec')
+        if to_wait:
+            self.wait(to_wait)
+        elif self.remaining is not None and self.remaining <= 0:
+            # The budget is spent, but the API hasn't told us how long until it
+            # resets, so we fall back to waiting out the rate limit window.
+            self.wait(_header(headers, 'X-RateLimit-Window-Sec') or self.backoff)
+
+    def retry_delay(self, headers: Mapping[str, str], attempt: int) -> float:
+        """
+        Returns how long to wait before retrying a failed call.  The API supplied
+        wait time is preferred over the exponential backoff.
+
+        Args:
+            headers: The headers of the failed response
+            attempt: The retry attempt number (starting at 1)
+        """
+        to_wait = _header(headers, 'X-RateLimit-ToWait-Sec') or _header(
+            headers, 'Retry-After'
+        )
+        if to_wait is None:
+            to_wait = self.backoff * 2 ** (attempt - 1)
+        return min(to_wait, self.max_wait)
@@ -0,0 +1,20 @@
+"""
+Shared helpers for the Qualys API modules.
+"""
+
+from datetime import datetime
+
+import arrow
+from arrow.arrow import Arrow
+
+
+def since_param(since: Arrow | datetime | int | str) -> str:
+    """
+    Formats a timestamp for the ``*_since`` & ``*_after`` query parameters.  Qualys
+    expects ``YYYY-MM-DD[THH:MM:SSZ]`` in UTC, without fractional seconds or a
+    numeric offset.
+
+    Args:
+        since: Anything that arrow can parse (timestamp, datetime, ISO string).
+    """
+    return arrow.get(since).to('utc').format('YYYY-MM-DDTHH:mm:ss[Z]')
@@ -2,10 +2,26 @@
 Cache database module.
 """
 
-from collections import namedtuple
+import mmap
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from typing import IO, Any, Iterator
 
 import sqlalchemy as sa
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import (
+    DeclarativeBase,
+    Mapped,
+    Session,
+    mapped_column,
+    sessionmaker,
+)
+from sqlalchemy.pool import StaticPool
 
 
 class Base(DeclarativeBase):
@@ -18,13 +34,306 @@ class Knowledgebase(Base):
     cves: Mapped[list[str]] = mapped_column(sa.JSON, default=[])
 
 
-def init_db(uri: str = 'sqlite:///cache.db'):
+class CacheState(Base):
+    __tablename__ = 'cache_state'
+    key: Mapped[str] = mapped_column(primary_key=True)
+    value: Mapped[str | None]
+
+
+def init_db(uri: str = 'sqlite:///cache.db', flush: bool = False):
     """
     Initialize the database
+
+    Args:
+        uri: The database URI
+        flush:
+            Should any existing cached data be dropped?  By default the cache is
+            retained between runs so that the knowledgebase can be incrementally
+            updated.
     """
     Database = namedtuple('DB', ['engine', 'session'])
-    engine = sa.create_engine(uri)
-    Base.metadata.drop_all(engine)
+    url = sa.make_url(uri)
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        # An in-memory database only exists within the connection that created it,
+        # so every thread (e.g. the background knowledgebase download) must share
+        # that single connection.
+        engine = sa.create_engine(
+            uri,
+            poolclass=StaticPool,
+            connect_args={'check_same_thread': False},
+        )
+    else:
+        engine = sa.create_engine(uri)
+    if flush:
+        Base.metadata.drop_all(engine)
     Base.metadata.create_all(engine)
     Session = sessionmaker(bind=engine)
     return Database(engine=engine, session=Session)
+
+
+def get_state(session: Session, key: str) -> str | None:
+    """
+    Returns the stored cache state value for the given key.
+    """
+    state = session.get(CacheState, key)
+    return state.value if state else None
+
+
+def set_state(session: Session, key: str, value: str | None) -> None:
+    """
+    Stores the cache state value for the given key.  The caller is responsible for
+    committing the session.
+    """
+    session.merge(CacheState(key=key, value=value))
+
+
+@contextmanager
+def bulk_load(engine: sa.Engine) -> Iterator[sa.Connection]:
+    """
+    Context manager yielding a connection tuned for a SQLite bulk load.  The journal
+    is switched into WAL mode (which persists for the database file) and syncing is
+    disabled on the connection until the load has completed.
+
+    Example:
+        >>> with bulk_load(db.engine) as conn, db.session(bind=conn) as session:
+        ...     upsert_knowledgebase(session, rows)
+        ...     session.commit()
+    """
+    with engine.connect() as conn:
+        if engine.dialect.name != 'sqlite':
+            yield conn
+            return
+        synchronous = conn.exec_driver_sql('PRAGMA synchronous').scalar()
+        conn.exec_driver_sql('PRAGMA journal_mode=WAL')
+        conn.exec_driver_sql('PRAGMA synchronous=OFF')
+        conn.commit()
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        else:
+            conn.commit()
+        finally:
+            conn.exec_driver_sql(f'PRAGMA synchronous={int(synchronous)}')
+            conn.commit()
+
+
+def upsert_knowledgebase(session: Session, rows: list[dict[str, Any]]) -> None:
+    """
+    Inserts the batch of knowledgebase rows into the cache, replacing the CVE list
+    of any QIDs that already exist.  The rows are sent as a single executemany.
+
+    Args:
+        session: The database session to use
+        rows: List of dictionaries with the ``id`` and ``cves`` keys.
+    """
+    if not rows:
+        return
+    stmt = insert(Knowledgebase)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Knowledgebase.id],
+        set_={'cves': stmt.excluded.cves},
+    )
+    session.execute(stmt, rows)
+
+
+class KnowledgebaseIndex:
+    """
+    In-process QID -> CVE lookup index.
+
+    By default the whole knowledgebase table is loaded into a dictionary the first
+    time a lookup is performed.  CVE strings are interned and identical CVE tuples
+    are shared between QIDs to keep the footprint as small as possible.  When a
+    ``max_size`` is provided, the index instead operates as an LRU cache in front of
+    the database, querying for any QID it hasn't seen recently.
+
+    Args:
+        db: The database tuple as returned from `init_db`
+        max_size: Optional maximum number of QIDs to keep in memory.
+    """
+
+    max_size: int | None
+    hits: int
+    misses: int
+
+    def __init__(self, db: tuple, max_size: int | None = None):
+        self.db = db
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._index = OrderedDict() if max_size else {}
+        self._tuples = {}
+        self._loaded = False
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _compact(self, cves: list[str] | None) -> tuple[str, ...]:
+        """
+        Returns the interned tuple representation of the CVE list.  Identical tuples
+        are only shared when the whole knowledgebase is held in memory, as the LRU
+        mode would otherwise never release them.
+        """
+        value = tuple(sys.intern(c) for c in cves or [])
+        if self.max_size:
+            return value
+        return self._tuples.setdefault(value, value)
+
+    def load(self) -> None:
+        """
+        (Re)loads the index from the cache database.  In LRU mode the index is
+        simply reset, as it will populate itself on demand.
+        """
+        self._index.clear()
+        self._tuples.clear()
+        if not self.max_size:
+            stmt = sa.select(Knowledgebase.id, Knowledgebase.cves)
+            with self.db.session() as session:
+                for qid, cves in session.execute(stmt):
+                    self._index[qid] = self._compact(cves)
+        self._loaded = True
+
+    def get(self, qid: int) -> tuple[str, ...]:
+        """
+        Returns the CVEs associated to the QID.  QIDs that don't exist within the
+        knowledgebase are treated as having no CVEs.
+        """
+        if not self._loaded:
+            self.load()
+        cves = self._index.get(qid)
+        if cves is not None:
+            self.hits += 1
+            if self.max_size:
+                self._index.move_to_end(qid)
+            return cves
+        self.misses += 1
+        if not self.max_size:
+            return ()
+
+        with self.db.session() as session:
+            kb = session.get(Knowledgebase, qid)
+        cves = self._compact(kb.cves if kb else None)
+        self._index[qid] = cves
+        if len(self._index) > self.max_size:
+            self._index.popitem(last=False)
+        return cves
+
+
+class MappedKnowledgebase:
+    """
+    Memory-mapped QID -> CVE lookup store.
+
+    Instead of holding the knowledgebase within Python objects, the cache table is
+    written into a flat file that is then memory-mapped.  The file consists of a
+    small header, the comma-joined CVE strings of every QID packed back to back, a
+    sorted array of the QIDs and an array of the offsets of each QID's CVE string.
+    Lookups are a binary search over the mapped QID array, so the only memory
+    allocated per lookup is the result itself, and the OS is free to page the file
+    in and out as required.
+
+    Args:
+        db: The database tuple as returned from `init_db`
+        directory:
+            The directory to create the (temporary) store file within.  Defaults
+            to the system temporary directory.
+    """
+
+    MAGIC = b'QKB1'
+    HEADER = struct.Struct('<4sQQ')
+    max_size = None
+    hits: int
+    misses: int
+
+    def __init__(self, db: tuple, directory: str | None = None):
+        self.db = db
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self._file = None
+        self._map = None
+        self._reset_views()
+        self._loaded = False
+
+    def __len__(self) -> int:
+        return len(self._qids)
+
+    def close(self) -> None:
+        """
+        Releases the memory map and removes the store file.
+        """
+        for view in (self._qids, self._offsets, self._blob):
+            view.release()
+        if self._map:
+            self._map.close()
+        if self._file:
+            self._file.close()
+        self._file = self._map = None
+        self._reset_views()
+        self._loaded = False
+
+    def _reset_views(self) -> None:
+        self._qids = memoryview(array('I'))
+        self._offsets = memoryview(array('Q', [0]))
+        self._blob = memoryview(b'')
+
+    def _write(self, fobj: IO[bytes]) -> None:
+        """
+        Writes the store file from the cache database.
+        """
+        qids, offsets = array('I'), array('Q', [0])
+        fobj.write(self.HEADER.pack(self.MAGIC, 0, 0))
+        stmt = sa.select(Knowledgebase.id, Knowledgebase.cves).order_by(
+            Knowledgebase.id
+        )
+        with self.db.session() as session:
+            for qid, cves in session.execute(stmt).yield_per(10000):
+                data = ','.join(cves or []).encode()
+                fobj.write(data)
+                qids.append(qid)
+                offsets.append(offsets[-1] + len(data))
+        fobj.write(b'\0' * (-fobj.tell() % 8))
+        index_offset = fobj.tell()
+        fobj.write(qids.tobytes())
+        fobj.write(b'\0' * (-fobj.tell() % 8))
+        fobj.write(offsets.tobytes())
+        fobj.seek(0)
+        fobj.write(self.HEADER.pack(self.MAGIC, len(qids), index_offset))
+        fobj.flush()
+
+    def load(self) -> None:
+        """
+        (Re)builds the store file from the cache database and maps it.
+        """
+        self.close()
+        self._file = tempfile.TemporaryFile(dir=self.directory)
+        self._write(self._file)
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, index_offset = self.HEADER.unpack_from(self._map)
+        if magic != self.MAGIC:
+            raise ValueError('The knowledgebase store file is corrupt')
+        view = memoryview(self._map)
+        qids_end = index_offset + count * 4
+        offsets_start = qids_end + (-qids_end % 8)
+        self._blob = view[self.HEADER.size : index_offset]
+        self._qids = view[index_offset:qids_end].cast('I')
+        self._offsets = view[offsets_start : offsets_start + (count + 1) * 8].cast('Q')
+        view.release()
+        self._loaded = True
+
+    def get(self, qid: int) -> tuple[str, ...]:
+        """
+        Returns the CVEs associated to the QID.  QIDs that don't exist within the
+        knowledgebase are treated as having no CVEs.
+        """
+        if not self._loaded:
+            self.load()
+        idx = bisect_left(self._qids, qid)
+        if idx == len(self._qids) or self._qids[idx] != qid:
+            self.misses += 1
+            return ()
+        self.hits += 1
+        start, end = self._offsets[idx], self._offsets[idx + 1]
+        if start == end:
+            return ()
+        return tuple(str(self._blob[start:end], 'ascii').split(','))
@@ -2,14 +2,66 @@
 Data transform module.
 """
 
+import json
 import logging
-from typing import Any
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Any, Generator, Iterable, Literal, NamedTuple
 
+import arrow
 from tenable.io import TenableIO
 
 from . import __version__ as version
 from .api import QualysAPI
-from .database import Knowledgebase, init_db
+from .api.models.findings import DetectionRecord
+from .api.streaming import merge_stats
+from .database import (
+    KnowledgebaseIndex,
+    MappedKnowledgebase,
+    bulk_load,
+    get_state,
+    init_db,
+    set_state,
+    upsert_knowledgebase,
+)
+
+STATUS_MAP = {
+    'New': 'ACTIVE',
+    'Active': 'ACTIVE',
+    'Fixed': 'INACTIVE',
+    'Re-Opened': 'REOPENED',
+}
+SEVERITY_MAP = {1: 'NONE', 2: 'LOW', 3: 'MEDIUM', 4: 'HIGH', 5: 'CRITICAL'}
+SPOOL_SUBDIR = 'qualys-spool'
+# The most finding templates to cache when the knowledgebase store isn't bounded.
+TEMPLATE_CACHE_SIZE = 10000
+
+
+class FindingTemplate(NamedTuple):
+    """
+    The QID dependent parts of a cve-finding.  The ``cve`` dictionary is shared
+    by every finding of the QID and must not be modified.
+    """
+
+    urn: str
+    cve: dict[str, list[str]]
+
+
+def _json_default(obj: Any) -> Any:
+    """
+    Serializes the values that the json module can't handle natively.
+    """
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, DetectionRecord):
+        return obj._asdict()
+    raise TypeError(f'{type(obj).__name__} is not JSON serializable')
 
 
 class Transformer:
@@ -19,6 +71,9 @@ class Transformer:
 
     counts: dict[str, dict[str, int]]
     db: tuple
+    kb: KnowledgebaseIndex | MappedKnowledgebase
+    xml_opts: dict[str, Any]
+    stats: dict[str, dict[str, Any]]
     get_findings: bool = True
 
     def __init__(
@@ -26,6 +81,14 @@ class Transformer:
         db_uri: str = 'sqlite:///cache.db',
         tvm: TenableIO | None = None,
         qualys: QualysAPI | None = None,
+        kb_cache_size: int | None = None,
+        kb_store: Literal['memory', 'mmap'] = 'memory',
+        flush_cache: bool = False,
+        xml_engine: Literal['pydantic', 'fast'] = 'fast',
+        prefetch: bool = False,
+        detection_shards: int = 1,
+        spool_dir: str | Path | None = None,
+        resume: bool = False,
     ):
         """
         Initialze transformer
@@ -34,8 +97,51 @@ class Transformer:
             db_uri: The cache database location
             tvm: Optional TVM session to use
             qualys: Optional QualysVM session to use
+            kb_cache_size:
+                If set, the in-memory knowledgebase index will only hold this
+                many QIDs at a time (LRU) instead of the whole knowledgebase.
+            kb_store:
+                Where the knowledgebase lookups are served from.  ``memory`` uses
+                the in-memory index, while ``mmap`` writes the knowledgebase into a
+                memory-mapped file (see `qualys.database.MappedKnowledgebase`).
+            flush_cache:
+                Should the cached knowledgebase be discarded and re-downloaded in
+                full instead of incrementally updated?
+            xml_engine:
+                The XML parse engine to use for the Qualys streams.  Refer to
+                `qualys.api.streaming.xml_handler` for details.
+            prefetch:
+                Should the next page of each Qualys stream be downloaded while
+                the current page is being parsed?
+            detection_shards:
+                How many host id ranges to download the detections for
+                concurrently.  A value of 1 downloads them as a single stream.
+            spool_dir:
+                If set, the raw Qualys pages are spooled to a dedicated
+                ``qualys-spool`` sub-directory of this directory before they're
+                parsed.  Only that sub-directory is removed after a successful run.
+            resume:
+                Should the pages spooled by a previous (failed) run be replayed
+                instead of downloaded again?
         """
-        self.db = init_db(db_uri)
+        self.db = init_db(db_uri, flush=flush_cache)
+        if kb_store == 'mmap':
+            self.kb = MappedKnowledgebase(self.db)
+        else:
+            self.kb = KnowledgebaseIndex(self.db, max_size=kb_cache_size)
+        self._templates: OrderedDict[tuple[int, int], FindingTemplate | None] = (
+            OrderedDict()
+        )
+        self.stats = {}
+        self.xml_opts = {
+            'engine': xml_engine,
+            'prefetch': prefetch,
+            'spool_dir': Path(spool_dir) / SPOOL_SUBDIR if spool_dir else None,
+            'resume': resume,
+            'compact': True,
+        }
+        self.detection_shards = detection_shards
+        self.host_ids = []
         self.tvm = (
             tvm
             if tvm
@@ -49,7 +155,16 @@ class Transformer:
         self.log = logging.getLogger('Transformer')
         self.counts = {}
 
-    def run(self, get_kbs: bool = True, get_findings: bool = True):
+    def run(
+        self,
+        get_kbs: bool = True,
+        get_findings: bool = True,
+        lazy_kbs: bool = False,
+        since: int | str | None = None,
+        incremental: bool = False,
+        single_pass: bool = False,
+        background_kbs: bool = True,
+    ):
         """
         Run the transformer
 
@@ -59,55 +174,431 @@ class Transformer:
                 a transitive database?
             get_findings:
                 Should we get findings as well as asset metadata?
+            lazy_kbs:
+                Should we only retrieve the KBs for the QIDs that were actually
+                detected?  When enabled, the detections are downloaded first and
+                spooled to a temporary file while the KBs are collected.
+            since:
+                Only collect the hosts scanned and the detections updated since
+                this timestamp.
+            incremental:
+                Should the timestamp of the last successful run be used when
+                ``since`` isn't specified?  The start time of this run is stored
+                as the new timestamp once all of the findings have been sent.
+            single_pass:
+                Should the assets be derived from the host records returned by the
+                detection endpoint instead of downloading every host twice?  Only
+                the inventory fields that the detection endpoint lacks and the
+                hosts without any detections are collected from the asset
+                endpoint.  Only applies when collecting the findings.
+            background_kbs:
+                Should the knowledgebase be cached by a background worker while the
+                assets are processed?  The findings phase then only waits for the
+                knowledgebase if it isn't ready yet.  When disabled, the
+                knowledgebase is cached before the assets are processed.  Doesn't
+                apply to ``lazy_kbs`` runs, as those need the detected QIDs first.
         """
         self.get_findings = get_findings
+        self.stats = {}
+        self.host_ids = []
+        started = arrow.utcnow()
+        if incremental and since is None:
+            with self.db.session() as session:
+                since = get_state(session, 'last_successful_run')
         job = self.tvm.sync.create(sync_id='tenable_qualys_vm')
 
-        with job:
-            self.log.info('Processing Qualys assets')
-            self.log.debug(f'sync_id: {job.sync_id} uuid: {job.uuid}')
-            for asset in self.qualys.assets.vuln():
-                t1asset = self.transform_asset(asset)
-                self.log.debug('Adding asset id=%s to the job' % t1asset['id'])
-                job.add(t1asset, object_type='device-asset')
-            self.counts['assets'] = {'sent': job.counters['device-asset']['accepted']}
-
-            if get_findings and get_kbs:
-                self.cache_knowledgebase()
-                self.log.info('Processing Qualys vulnerabilities')
-                for host in self.qualys.findings.vuln():
-                    for detection in host['detections']:
-                        finding = self.transform_finding(detection, host['id'])
-                        if finding:
-                            self.log.debug(
-                                'Adding finding id=%s to asset id=%s'
-                                % (finding['id'], host['id'])
-                            )
-                            job.add(finding, object_type='cve-finding')
-                self.counts['findings'] = {
-                    'sent': job.counters['cve-finding']['accepted']
-                }
+        # The executor isn't used as a context manager, as that would wait for the
+        # background KB download to complete even if the asset phase failed.
+        executor = ThreadPoolExecutor(max_workers=1)
+        cancel = threading.Event()
+        try:
+            with job:
+                self.log.debug(f'sync_id: {job.sync_id} uuid: {job.uuid}')
+                kbs = None
+                if get_findings and get_kbs and not lazy_kbs:
+                    if background_kbs:
+                        kbs = executor.submit(self.cache_knowledgebase, cancel=cancel)
+                    else:
+                        kbs = Future()
+                        kbs.set_result(self.cache_knowledgebase())
+                if single_pass and get_findings and get_kbs:
+                    self.single_pass(job, since=since, kbs=kbs)
+                else:
+                    if since is not None:
+                        self.log.info(f'Processing Qualys assets changed since {since}')
+                    else:
+                        self.log.info('Processing Qualys assets')
+                    assets = self.qualys.assets.vuln(
+                        since=since, stats=self.stage('assets'), **self.xml_opts
+                    )
+                    for asset in assets:
+                        if self.detection_shards > 1:
+                            self.host_ids.append(asset['id'])
+                        self.add_asset(job, asset)
+                    self.counts['assets'] = {
+                        'sent': job.counters['device-asset']['accepted']
+                    }
+
+                    if get_findings and get_kbs:
+                        if kbs is None:
+                            spool, qids = self.spool_findings(since=since)
+                            self.cache_knowledgebase(qids=qids)
+                            hosts = self.read_spool(spool)
+                        else:
+                            self.wait_for_knowledgebase(kbs)
+                            hosts = self.detections(since=since)
+                        self.log.info('Processing Qualys vulnerabilities')
+                        for host in hosts:
+                            self.add_findings(job, host)
+                        self.counts['findings'] = {
+                            'sent': job.counters['cve-finding']['accepted'],
+                            'dropped': self.stage('findings').get('dropped', 0),
+                        }
+                finalizing = time.perf_counter()
+        finally:
+            cancel.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+        self.stage('sync')['finalize_seconds'] = time.perf_counter() - finalizing
+        self.counts['stages'] = self.stage_summary()
+        if incremental and get_findings and get_kbs:
+            with self.db.session() as session:
+                set_state(
+                    session,
+                    'last_successful_run',
+                    started.floor('second').isoformat(),
+                )
+                session.commit()
+        if self.xml_opts['spool_dir']:
+            self.log.info('Removing the Qualys page spool')
+            shutil.rmtree(self.xml_opts['spool_dir'], ignore_errors=True)
         return self.counts
 
-    def cache_knowledgebase(self) -> None:
+    def wait_for_knowledgebase(self, kbs: Future) -> None:
+        """
+        Blocks until the knowledgebase has been cached, re-raising any error from
+        the background worker.  The time spent waiting is recorded within the
+        knowledgebase stage metrics.
+        """
+        if not kbs.done():
+            self.log.info('Waiting for the Qualys KB cache to complete')
+        started = time.perf_counter()
+        kbs.result()
+        self.stage('knowledgebase')['wait_seconds'] = time.perf_counter() - started
+
+    def stage(self, name: str) -> dict[str, Any]:
+        """
+        Returns the metrics dictionary of the named stage of the run.
+        """
+        return self.stats.setdefault(name, {})
+
+    def stage_summary(self) -> dict[str, dict[str, Any]]:
+        """
+        Summarizes the stage metrics of the run and logs a structured line for
+        each stage.  The per-page RSS lists of the XML streams are reduced to the
+        highest RSS and the largest growth within a single page.
+        """
+        summary = {}
+        for name, stats in self.stats.items():
+            stage = {}
+            for key, value in stats.items():
+                if key == 'page_rss':
+                    stage['peak_rss_kib'] = max(value, default=0)
+                elif key == 'page_rss_growth':
+                    stage['max_page_growth_kib'] = max(value, default=0)
+                elif isinstance(value, float):
+                    stage[key] = round(value, 3)
+                else:
+                    stage[key] = value
+            summary[name] = stage
+            self.log.info(
+                f'stage={name} ' + ' '.join(f'{k}={v}' for k, v in stage.items())
+            )
+        return summary
+
+    def add_asset(self, job, data: dict[str, Any]) -> None:
+        """
+        Transforms the Qualys host and adds the device-asset to the job.
+        """
+        started = time.perf_counter()
+        t1asset = self.transform_asset(data)
+        transformed = time.perf_counter()
+        self.log.debug('Adding asset id=%s to the job' % t1asset['id'])
+        job.add(t1asset, object_type='device-asset')
+        merge_stats(
+            self.stage('assets'),
+            {
+                'transform_seconds': transformed - started,
+                'add_seconds': time.perf_counter() - transformed,
+            },
+        )
+
+    def add_findings(self, job, host: dict[str, Any]) -> None:
+        """
+        Transforms the detections of the host and adds the findings to the job.
+        The transform time includes the KB lookups, which are also tracked on
+        their own.
+        """
+        transform = add = 0.0
+        dropped = 0
+        for detection in host.get('detections', []):
+            started = time.perf_counter()
+            finding = self.transform_finding(detection, host['id'])
+            transformed = time.perf_counter()
+            transform += transformed - started
+            if finding:
+                self.log.debug(
+                    'Adding finding id=%s to asset id=%s' % (finding['id'], host['id'])
+                )
+                job.add(finding, object_type='cve-finding')
+                add += time.perf_counter() - transformed
+            else:
+                dropped += 1
+        merge_stats(
+            self.stage('findings'),
+            {'transform_seconds': transform, 'add_seconds': add, 'dropped': dropped},
+        )
+
+    def single_pass(
+        self,
+        job,
+        since: int | str | None = None,
+        kbs: Future | None = None,
+    ) -> None:
+        """
+        Adds both the assets and the findings to the job from the host records of
+        the detection endpoint.  The detection endpoint doesn't return the host's
+        serial number, hardware uuid, first found date or agent status, so those
+        are collected up-front from the asset endpoint (see
+        `AssetsAPI.inventory`) and merged into each host record.  The hosts that
+        returned no detections are then collected from the asset endpoint.
+
+        Args:
+            job: The sync job to add the assets and findings to.
+            since: Only collect the hosts & detections changed since this timestamp.
+            kbs:
+                The pending knowledgebase cache (see `run`).  If None, only the KBs
+                for the QIDs that were detected are collected.
+        """
+        self.log.info('Collecting the Qualys host inventory')
+        inventory = {
+            h.pop('id'): h
+            for h in self.qualys.assets.inventory(
+                since=since, stats=self.stage('inventory'), **self.xml_opts
+            )
+        }
+        if self.detection_shards > 1:
+            self.host_ids = list(inventory)
+
+        if kbs is None:
+            spool, qids = self.spool_findings(since=since, full_hosts=True)
+            self.cache_knowledgebase(qids=qids)
+            hosts = self.read_spool(spool)
+        else:
+            self.wait_for_knowledgebase(kbs)
+            hosts = self.detections(since=since)
+
+        self.log.info('Processing Qualys assets and vulnerabilities')
+        for host in hosts:
+            host.update(inventory.pop(host['id'], {}))
+            self.add_asset(job, host)
+            self.add_findings(job, host)
+
+        self.log.info(f'Processing {len(inventory)} Qualys assets without detections')
+        assets = self.qualys.assets.vuln_by_ids(
+            inventory, stats=self.stage('assets'), **self.xml_opts
+        )
+        for asset in assets:
+            self.add_asset(job, asset)
+        self.counts['assets'] = {'sent': job.counters['device-asset']['accepted']}
+        self.counts['findings'] = {
+            'sent': job.counters['cve-finding']['accepted'],
+            'dropped': self.stage('findings').get('dropped', 0),
+        }
+
+    def detections(
+        self, since: int | str | None = None
+    ) -> Generator[dict[str, Any], None, None]:
+        """
+        Returns the Qualys detection stream, sharded by the host ids that were seen
+        during the asset download when more than one shard was requested.
+
+        Args:
+            since: Only return the detections updated since this timestamp.
+        """
+        if self.detection_shards > 1 and self.host_ids:
+            self.log.info(
+                f'Downloading detections in {self.detection_shards} host id shards'
+            )
+            return self.qualys.findings.vuln_sharded(
+                self.host_ids,
+                shards=self.detection_shards,
+                since=since,
+                stats=self.stage('detections'),
+                **self.xml_opts,
+            )
+        return self.qualys.findings.vuln(
+            since=since, stats=self.stage('detections'), **self.xml_opts
+        )
+
+    def spool_findings(
+        self,
+        since: int | str | None = None,
+        full_hosts: bool = False,
+    ) -> tuple[IO[str], set[int]]:
+        """
+        Downloads the Qualys detections into a temporary spool file.
+
+        Args:
+            since: Only spool the detections updated since this timestamp.
+            full_hosts:
+                Spool the whole host record instead of only the host id and the
+                detections.
+
+        Returns:
+            The spool file (rewound to the beginning) and the set of QIDs that were
+            seen within the detections.
+        """
+        self.log.info('Spooling Qualys vulnerabilities')
+        qids = set()
+        spool = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+        for host in self.detections(since=since):
+            detections = host.get('detections', [])
+            qids.update(d['qid'] for d in detections)
+            record = (
+                host if full_hosts else {'id': host['id'], 'detections': detections}
+            )
+            spool.write(json.dumps(record, default=_json_default) + '\n')
+        spool.seek(0)
+        self.log.info(f'Spooled detections referencing {len(qids)} unique QIDs')
+        return spool, qids
+
+    def read_spool(self, spool: IO[str]) -> Generator[dict[str, Any], None, None]:
+        """
+        Replays the hosts stored within a spool file and closes it afterwards.
+        """
+        with spool:
+            for line in spool:
+                yield json.loads(line)
+
+    def cache_knowledgebase(
+        self,
+        batch_size: int = 5000,
+        qids: Iterable[int] | None = None,
+        cves_only: bool = True,
+        cancel: threading.Event | None = None,
+    ) -> None:
         """
         Stores CVE metadata into the cache database
 
         Queries the Qualys Knowldegbase API and stores the CVE data into the cache for
-        later use as the findings report does not contain the CVE data.
+        later use as the findings report does not contain the CVE data.  The cache is
+        retained between runs, so only the KBs modified since the newest
+        modification date that we have previously seen will be downloaded.
+
+        Args:
+            batch_size: How many KBs to write to the cache in each bulk insert.
+            qids:
+                If provided, only these QIDs will be requested from Qualys.  As
+                this is only a partial view of the knowledgebase, the stored
+                modification high-water mark is neither used nor updated.
+            cves_only:
+                Only parse the CVE ids of each KB instead of the full details.
+            cancel:
+                If set while the KBs are being collected, the collection stops
+                without storing the current batch or the modification high-water
+                mark.
         """
-        self.log.info('Collecting Qualys KB meta data')
         counter = 0
-        with self.db.session() as session:
-            for kb in self.qualys.knowledgebase.list():
+        batch = []
+        stats = self.stage('knowledgebase')
+        started = time.perf_counter()
+        with (
+            bulk_load(self.db.engine) as conn,
+            self.db.session(bind=conn) as session,
+        ):
+            high_water = None
+            if qids is not None:
+                self.log.info('Collecting Qualys KB meta data for detected QIDs')
+                kbs = self.qualys.knowledgebase.list_by_ids(
+                    qids, cves_only=cves_only, stats=stats, **self.xml_opts
+                )
+            elif since := get_state(session, 'kb_last_modified'):
+                self.log.info(f'Collecting Qualys KB meta data modified since {since}')
+                high_water = arrow.get(since)
+                kbs = self.qualys.knowledgebase.list(
+                    since=high_water, cves_only=cves_only, stats=stats, **self.xml_opts
+                )
+            else:
+                self.log.info('Collecting Qualys KB meta data')
+                kbs = self.qualys.knowledgebase.list(
+                    cves_only=cves_only, stats=stats, **self.xml_opts
+                )
+            for kb in kbs:
+                if cancel is not None and cancel.is_set():
+                    self.log.info('Qualys KB caching cancelled')
+                    return
                 qid = kb['qid']
                 cves = [i['id'] for i in kb.get('cves', [])]
                 self.log.debug('Caching qid=%d cves=%s' % (qid, ','.join(cves)))
-                session.add(Knowledgebase(id=qid, cves=cves))
-                counter += 1
-                if counter >= 1000:
+                batch.append({'id': qid, 'cves': cves})
+                modified = arrow.get(kb['last_modified'])
+                if high_water is None or modified > high_water:
+                    high_water = modified
+                if len(batch) >= batch_size:
+                    upsert_knowledgebase(session, batch)
                     session.commit()
+                    counter += len(batch)
+                    batch = []
+                    self.log.info(
+                        f'Cached {counter} KBs '
+                        f'({counter / (time.perf_counter() - started):.0f} KBs/sec)'
+                    )
+            upsert_knowledgebase(session, batch)
+            counter += len(batch)
+            if high_water and qids is None:
+                set_state(session, 'kb_last_modified', high_water.isoformat())
             session.commit()
+        self._templates.clear()
+        merge_stats(
+            stats, {'cached': counter, 'seconds': time.perf_counter() - started}
+        )
+        self.log.info(
+            f'Cached {counter} KBs in {time.perf_counter() - started:.2f} seconds'
+        )
+        self.kb.load()
+
+    def finding_template(self, qid: int, max_cves: int = 512) -> FindingTemplate | None:
+        """
+        Returns the parts of the cve-finding that only depend on the QID.  The
+        templates are cached, so the URN and the truncated CVE list are only built
+        once per QID.  The cache is an LRU holding as many templates as the
+        knowledgebase index (or `TEMPLATE_CACHE_SIZE` if the store isn't bounded).
+        Returns None if the QID has no known CVEs.
+        """
+        key = (qid, max_cves)
+        if key in self._templates:
+            self._templates.move_to_end(key)
+            return self._templates[key]
+        started = time.perf_counter()
+        cves = self.kb.get(qid)
+        merge_stats(
+            self.stage('findings'),
+            {'kb_lookups': 1, 'kb_lookup_seconds': time.perf_counter() - started},
+        )
+        template = None
+        if cves:
+            if len(cves) > max_cves:
+                self.log.debug(
+                    'Truncating the first %s of %s cves for qid=%s due to T1 API restrictions.'
+                    % (max_cves, len(cves), qid)
+                )
+            template = FindingTemplate(
+                urn=f'qualys:{qid}', cve={'cves': list(cves[:max_cves])}
+            )
+        self._templates[key] = template
+        if len(self._templates) > (self.kb.max_size or TEMPLATE_CACHE_SIZE):
+            self._templates.popitem(last=False)
+        return template
 
     def transform_finding(
         self,
@@ -118,46 +609,26 @@ class Transformer:
         """
         Converts the raw Qualys finding into a T1-compatable cve-finding.
         """
-        status_switch = {
-            'New': 'ACTIVE',
-            'Active': 'ACTIVE',
-            'Fixed': 'INACTIVE',
-            'Re-Opened': 'REOPENED',
-        }
-        sev_switch = {1: 'NONE', 2: 'LOW', 3: 'MEDIUM', 4: 'HIGH', 5: 'CRITICAL'}
-        with self.db.session() as session:
-            kb = (
-                session.query(Knowledgebase)
-                .filter(Knowledgebase.id == data['qid'])
-                .one()
+        template = self.finding_template(data['qid'], max_cves)
+        if template is None:
+            self.log.debug(
+                'Dropping asset=%s, finding=%s as there are no known cves.'
+                % (data['id'], asset_id)
             )
-            if len(kb.cves) == 0:
-                self.log.debug(
-                    'Dropping asset=%s, finding=%s as there are no known cves.'
-                    % (data['id'], asset_id)
-                )
-                return {}
-            elif len(kb.cves) > max_cves:
-                self.log.debug(
-                    'Truncating the first %s of %s cves for qid=%s due to T1 API restrictions.'
-                    % (max_cves, len(kb.cves), data['qid'])
-                )
-            resp = {
-                'object_type': 'cve-finding',
-                'asset_id': str(asset_id),
-                'id': str(data['id']),
-                'definition_urn': f'qualys:{data["qid"]}',
-                'state': status_switch.get(data.get('status'), 'ACTIVE'),
-                'cve': {'cves': kb.cves[:max_cves]},
-                'discovery': {
-                    'first_observed_at': data.get('first_found'),
-                    'last_observed_on': data.get('last_found'),
-                },
-                'exposure': {
-                    'severity': {'level': sev_switch.get(data.get('severity'))}
-                },
-            }
-        return resp
+            return {}
+        return {
+            'object_type': 'cve-finding',
+            'asset_id': str(asset_id),
+            'id': str(data['id']),
+            'definition_urn': template.urn,
+            'state': STATUS_MAP.get(data.get('status'), 'ACTIVE'),
+            'cve': template.cve,
+            'discovery': {
+                'first_observed_at': data.get('first_found'),
+                'last_observed_on': data.get('last_found'),
+            },
+            'exposure': {'severity': {'level': SEVERITY_MAP.get(data.get('severity'))}},
+        }
 
     def get_os_type(self, value: str | None) -> str | None:
         """
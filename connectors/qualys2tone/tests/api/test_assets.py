@@ -1,7 +1,8 @@
-import pytest
 import responses
 from responses.matchers import query_param_matcher
 
+from qualys.api.utils import since_param
+
 
 @responses.activate
 def test_assets_list(qapi, asset_page):
@@ -46,7 +47,7 @@ def test_assets_vulns(qapi, asset_page):
                     'show_trurisk_factors': 1,
                     'show_cloud_tags': 1,
                     'truncation_limit': 10000,
-                    'vm_scan_since': '2024-12-03T14:01:27+00:00',
+                    'vm_scan_since': '2024-12-03T14:01:27Z',
                 }
             )
         ],
@@ -57,6 +58,53 @@ def test_assets_vulns(qapi, asset_page):
         assert isinstance(item, dict)
 
 
-def test_assets_compliance(qapi):
-    with pytest.raises(NotImplementedError):
-        qapi.assets.compliance()
+@responses.activate
+def test_assets_compliance(qapi, asset_page):
+    responses.get(
+        'https://nourl.qualys/api/2.0/fo/asset/host/',
+        match=[
+            query_param_matcher(
+                {
+                    'compliance_enabled': 1,
+                    'compliance_scan_since': '2024-12-03T14:01:27Z',
+                },
+                strict_match=False,
+            )
+        ],
+        body=asset_page,
+    )
+    hosts = list(qapi.assets.compliance(since=1733234487))
+    assert hosts[0]['id'] == 12345
+
+
+@responses.activate
+def test_assets_inventory(qapi, asset_page):
+    responses.get(
+        'https://nourl.qualys/api/2.0/fo/asset/host/',
+        match=[
+            query_param_matcher(
+                {
+                    'action': 'list',
+                    'truncation_limit': 10000,
+                    'vm_scan_since': '2024-12-03T14:01:27Z',
+                }
+            )
+        ],
+        body=asset_page,
+    )
+    hosts = list(qapi.assets.inventory(since=1733234487))
+    assert hosts == [
+        {
+            'id': 12345,
+            'serial_number': 'VMware-56 4d d2 32 1b d5 ba 19-0c 78 86 69 8b e1 40 35',
+            'hardware_uuid': '32d24d56-d51b-19ba-0c78-86698be14035',
+            'first_found_date': hosts[0]['first_found_date'],
+            'agent_status': 'Inventory Scan Complete',
+        }
+    ]
+    assert hosts[0]['first_found_date'] is not None
+
+
+def test_since_param():
+    assert since_param(1733234487) == '2024-12-03T14:01:27Z'
+    assert since_param('2024-12-03T15:01:27.314203+01:00') == '2024-12-03T14:01:27Z'
@@ -0,0 +1,74 @@
+import pytest
+import responses
+from lxml.etree import fromstring, tostring
+from responses.registries import OrderedRegistry
+from restfly import APISession
+
+from qualys.api.fastparse import to_dict
+from qualys.api.models.asset import Host
+from qualys.api.models.findings import Detection, DetectionRecord
+from qualys.api.models.knowledgebase import KnowledgebaseCVEs, KnowledgebaseVuln
+from qualys.api.streaming import xml_handler
+
+
+def compare(xml: str, model):
+    elem = fromstring(xml.strip())
+    assert to_dict(elem, model) == model.from_xml(xml.strip()).model_dump(
+        exclude_none=True
+    )
+
+
+def test_fastparse_host(host, asset_finding):
+    compare(host, Host)
+    compare(asset_finding, Host)
+
+
+def test_fastparse_knowledgebase(kbs_page):
+    vuln = fromstring(kbs_page.strip()).find('RESPONSE/VULN_LIST/VULN')
+    compare(tostring(vuln, encoding='unicode'), KnowledgebaseVuln)
+    compare(tostring(vuln, encoding='unicode'), KnowledgebaseCVEs)
+
+
+def test_fastparse_required_fields():
+    with pytest.raises(ValueError, match='missing the required fields'):
+        to_dict(fromstring('<DETECTION><QID>1</QID></DETECTION>'), Detection)
+
+
+def test_fastparse_compact(asset_finding):
+    full = to_dict(fromstring(asset_finding.strip()), Host)
+    compact = to_dict(fromstring(asset_finding.strip()), Host, compact=True)
+    detection = full['detections'][0]
+    record = compact['detections'][0]
+    assert isinstance(record, DetectionRecord)
+    assert record == {k: v for k, v in detection.items() if k in record.__slots__}
+    assert record['qid'] == detection['qid']
+    assert record.get('results') is None
+    with pytest.raises(KeyError):
+        record['results']
+    assert 'qid' in record
+    assert 'results' not in record
+    assert dict(record) == record._asdict()
+    assert len(record) == len(record.keys()) == len(record._asdict())
+    assert list(DetectionRecord(id=1, qid=2)) == ['id', 'qid']
+    assert len(DetectionRecord(id=1, qid=2)) == 2
+    assert not hasattr(record, '__dict__')
+    assert {k: v for k, v in compact.items() if k != 'detections'} == {
+        k: v for k, v in full.items() if k != 'detections'
+    }
+
+
+@responses.activate(registry=OrderedRegistry)
+def test_xml_handler_fast_engine(asset_page, asset_page_one):
+    class TestSession(APISession):
+        _url = 'https://nourl.com'
+
+    responses.get('https://nourl.com/', body=asset_page_one)
+    responses.get('https://nourl.com/', body=asset_page)
+    fast = list(
+        xml_handler(TestSession(), '', params={}, model=Host, tag='HOST', engine='fast')
+    )
+    responses.get('https://nourl.com/', body=asset_page_one)
+    responses.get('https://nourl.com/', body=asset_page)
+    slow = list(xml_handler(TestSession(), '', params={}, model=Host, tag='HOST'))
+    assert len(fast) == 2
+    assert fast == slow
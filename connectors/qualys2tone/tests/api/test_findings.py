@@ -2,6 +2,8 @@ import pytest
 import responses
 from responses.matchers import query_param_matcher
 
+from qualys.api.findings import id_ranges
+
 
 @responses.activate
 def test_findings_list(qapi, findings_page):
@@ -60,7 +62,7 @@ def test_findings_vuln(qapi, findings_page):
                     'compliance_enabled': 0,
                     'filter_superseded_qids': 1,
                     'truncation_limit': 10000,
-                    'detection_updated_since': '2024-12-03T14:01:27+00:00',
+                    'detection_updated_since': '2024-12-03T14:01:27Z',
                 }
             )
         ],
@@ -70,6 +72,62 @@ def test_findings_vuln(qapi, findings_page):
         assert isinstance(finding, dict)
 
 
-def test_findings_compliance(qapi):
-    with pytest.raises(NotImplementedError):
-        qapi.findings.compliance()
+@responses.activate
+@pytest.mark.parametrize('engine', ['pydantic', 'fast'])
+def test_findings_compliance(qapi, posture_page, engine):
+    url = 'https://nourl.qualys/api/2.0/fo/compliance/posture/info/'
+    for policy_id in (1, 2):
+        responses.get(
+            url,
+            body=posture_page,
+            match=[
+                query_param_matcher(
+                    {
+                        'action': 'list',
+                        'details': 'None',
+                        'truncation_limit': 10000,
+                        'policy_id': policy_id,
+                        'host_ids': '12,34',
+                        'status_changes_since': '2024-12-03T14:01:27Z',
+                    }
+                )
+            ],
+        )
+    postures = list(
+        qapi.findings.compliance(
+            [1, 2], since=1733234487, host_ids=[34, 12], engine=engine
+        )
+    )
+    assert len(postures) == 2
+    assert postures[0]['host_id'] == 12345
+    assert postures[0]['status'] == 'Failed'
+    assert postures[0]['criticality'] == {'label': 'SERIOUS', 'value': 3}
+
+
+def test_id_ranges():
+    assert id_ranges([], 4) == [(None, None)]
+    assert id_ranges([5, 1, 3], 1) == [(None, None)]
+    assert id_ranges([1, 2, 3, 4, 5, 6], 3) == [(None, 2), (3, 4), (5, None)]
+    assert id_ranges([7, 7, 9], 5) == [(None, 8), (9, None)]
+
+
+@responses.activate
+def test_findings_vuln_sharded(qapi, findings_page):
+    url = 'https://nourl.qualys/api/2.0/fo/asset/host/vm/detection/'
+    low = responses.get(
+        url,
+        body=findings_page,
+        match=[query_param_matcher({'id_max': '19'}, strict_match=False)],
+    )
+    high = responses.get(
+        url,
+        body=findings_page,
+        match=[query_param_matcher({'id_min': '20'}, strict_match=False)],
+    )
+    stats = {}
+    hosts = list(qapi.findings.vuln_sharded([10, 20], shards=2, stats=stats))
+    assert len(hosts) == 2
+    assert stats['pages'] == 2
+    assert stats['records'] == 2
+    assert low.call_count == 1
+    assert high.call_count == 1
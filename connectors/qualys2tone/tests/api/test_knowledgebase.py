@@ -1,3 +1,5 @@
+from datetime import UTC, datetime
+
 import responses
 from responses.matchers import query_param_matcher
 
@@ -21,3 +23,75 @@ def test_kbs_list(qapi, kbs_page):
     kbs = qapi.knowledgebase.list()
     for kb in kbs:
         assert isinstance(kb, dict)
+
+
+@responses.activate
+def test_kbs_list_since(qapi, kbs_page):
+    responses.get(
+        'https://nourl.qualys/api/2.0/fo/knowledge_base/vuln/',
+        body=kbs_page,
+        match=[
+            query_param_matcher(
+                {
+                    'action': 'list',
+                    'details': 'All',
+                    'show_disabled_flag': 1,
+                    'last_modified_after': '2018-01-04T17:39:37Z',
+                }
+            )
+        ],
+    )
+    kbs = qapi.knowledgebase.list(since='2018-01-04T17:39:37+00:00')
+    for kb in kbs:
+        assert isinstance(kb, dict)
+
+
+@responses.activate
+def test_kbs_list_by_ids(qapi, kbs_page):
+    url = 'https://nourl.qualys/api/2.0/fo/knowledge_base/vuln/'
+    chunks = [
+        responses.get(
+            url,
+            body=kbs_page,
+            match=[
+                query_param_matcher(
+                    {
+                        'action': 'list',
+                        'details': 'All',
+                        'show_disabled_flag': 1,
+                        'ids': ids,
+                    }
+                )
+            ],
+        )
+        for ids in ('1,2', '3')
+    ]
+    kbs = list(qapi.knowledgebase.list_by_ids([3, 2, 1, 2], chunk_size=2))
+    assert len(kbs) == 2
+    assert [c.call_count for c in chunks] == [1, 1]
+
+
+@responses.activate
+def test_kbs_list_cves_only(qapi, kbs_page):
+    responses.get(
+        'https://nourl.qualys/api/2.0/fo/knowledge_base/vuln/',
+        body=kbs_page,
+        match=[
+            query_param_matcher(
+                {
+                    'action': 'list',
+                    'details': 'All',
+                    'show_disabled_flag': 1,
+                    'last_modified_after': '1999-01-01',
+                }
+            )
+        ],
+    )
+    kbs = list(qapi.knowledgebase.list(cves_only=True))
+    assert kbs == [
+        {
+            'qid': 6,
+            'last_modified': datetime(2018, 1, 4, 17, 39, 37, tzinfo=UTC),
+            'cves': [{'id': 'CVE-1999-0001'}],
+        }
+    ]
@@ -0,0 +1,60 @@
+from io import BytesIO
+
+import pytest
+import responses
+from responses.registries import OrderedRegistry
+from restfly import APISession
+
+from qualys.api.models.asset import Host
+from qualys.api.spool import PageSpool
+from qualys.api.streaming import xml_handler
+
+
+@pytest.fixture
+def test_session():
+    class TestSession(APISession):
+        _url = 'https://nourl.com'
+
+    return TestSession()
+
+
+def test_page_spool(tmp_path):
+    spool = PageSpool(tmp_path, 'asset/host/', {'action': 'list'})
+    spool.reset()
+    source = BytesIO(b'<PAGE/>')
+    spool.add(source, 'https://nourl.com/?id_min=2')
+    spool.add(BytesIO(b'<PAGE/>'), None)
+    spool.update(1, 'https://nourl.com/?id_min=3')
+    assert source.tell() == 0
+    with spool.open(0) as fobj:
+        assert fobj.read() == b'<PAGE/>'
+
+    reloaded = PageSpool(tmp_path, 'asset/host/', {'action': 'list'})
+    assert reloaded.load()
+    assert reloaded.next_url == 'https://nourl.com/?id_min=3'
+    assert not PageSpool(tmp_path, 'asset/host/', {'action': 'other'}).load()
+
+
+@responses.activate(registry=OrderedRegistry)
+@pytest.mark.parametrize('prefetch', [False, True])
+def test_xml_handler_resume(
+    test_session, asset_page, asset_page_one, tmp_path, prefetch
+):
+    responses.get('https://nourl.com/', body=asset_page_one)
+    responses.get('https://nourl.com/', body=asset_page)
+    opts = {'model': Host, 'tag': 'HOST', 'spool_dir': tmp_path, 'prefetch': prefetch}
+
+    # Simulate a crash once the first record was handled.
+    data = xml_handler(test_session, path='', params={}, **opts)
+    first = next(data)
+    data.close()
+
+    records = list(xml_handler(test_session, path='', params={}, resume=True, **opts))
+    assert records[0] == first
+    assert len(records) == 2
+    assert len(responses.calls) == 2
+
+    # Without resume, the spool is discarded and everything is downloaded again.
+    responses.get('https://nourl.com/', body=asset_page)
+    assert len(list(xml_handler(test_session, path='', params={}, **opts))) == 1
+    assert len(responses.calls) == 3
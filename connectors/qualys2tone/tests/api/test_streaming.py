@@ -1,11 +1,24 @@
+import inspect
+import threading
+import time
+from io import BytesIO
+
 import pytest
 import responses
 from responses.registries import OrderedRegistry
 from restfly import APISession
 from tenable.errors import APIError
 
+from qualys.api import fastparse, streaming, throttle
 from qualys.api.models.asset import Host
-from qualys.api.streaming import handle_request, xml_handler
+from qualys.api.streaming import (
+    current_rss,
+    find_next_url,
+    handle_request,
+    merge_streams,
+    xml_handler,
+)
+from qualys.api.throttle import Throttle
 
 
 @pytest.fixture
@@ -26,16 +39,47 @@ def test_handle_request(test_session, asset_page):
 
 @responses.activate(registry=OrderedRegistry)
 def test_handle_retry_counter(test_session, asset_page):
-    responses.get('https://nourl.com/', status=400)
-    responses.get('https://nourl.com/', status=400)
+    responses.get('https://nourl.com/', status=409)
+    responses.get('https://nourl.com/', status=409)
     responses.get('https://nourl.com/', body=asset_page)
     with pytest.raises(APIError):
         handle_request(api=test_session, url='', retries=0)
 
-    h = handle_request(api=test_session, url='', delay=1)
+    h = handle_request(api=test_session, url='', delay=0)
     assert h.content == bytes(asset_page, encoding='utf-8')
 
 
+@responses.activate(registry=OrderedRegistry)
+def test_handle_request_fatal(test_session, asset_page):
+    responses.get('https://nourl.com/', status=401)
+    responses.get('https://nourl.com/', body=asset_page)
+    with pytest.raises(APIError):
+        handle_request(api=test_session, url='', delay=0)
+    assert len(responses.calls) == 1
+
+
+@responses.activate(registry=OrderedRegistry)
+def test_handle_request_rate_limit(test_session, asset_page, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(throttle.time, 'sleep', sleeps.append)
+    responses.get(
+        'https://nourl.com/',
+        status=409,
+        headers={'X-RateLimit-Remaining': '0', 'X-RateLimit-ToWait-Sec': '7'},
+    )
+    responses.get(
+        'https://nourl.com/',
+        body=asset_page,
+        headers={'X-RateLimit-Remaining': '299', 'X-Concurrency-Limit-Limit': '5'},
+    )
+    limiter = Throttle()
+    handle_request(api=test_session, url='', throttle=limiter)
+    assert len(sleeps) == 1
+    assert 6 < sleeps[0] <= 7
+    assert limiter.concurrency == 5
+    assert limiter.remaining == 299
+
+
 @responses.activate(registry=OrderedRegistry)
 def test_xml_handler(test_session, asset_page, asset_page_one):
     responses.get('https://nourl.com/', body=asset_page_one)
@@ -43,3 +87,185 @@ def test_xml_handler(test_session, asset_page, asset_page_one):
     data = xml_handler(test_session, path='', params={}, model=Host, tag='HOST')
     for item in data:
         assert isinstance(item, dict)
+
+
+def test_current_rss():
+    before = current_rss()
+    blob = b'x' * 64 * 1024 * 1024
+    grown = current_rss()
+    del blob
+    # Unlike the peak RSS, the current RSS drops again once the memory is freed.
+    assert grown - before > 32 * 1024
+    assert current_rss() < grown - 32 * 1024
+
+
+@responses.activate(registry=OrderedRegistry)
+def test_xml_handler_stats(test_session, asset_page, asset_page_one):
+    responses.get('https://nourl.com/', body=asset_page_one)
+    responses.get('https://nourl.com/', body=asset_page)
+    stats = {}
+    data = xml_handler(
+        test_session, path='', params={}, model=Host, tag='HOST', stats=stats
+    )
+    assert len(list(data)) == 2
+    assert stats['pages'] == 2
+    assert stats['records'] == 2
+    assert len(stats['page_rss']) == 2
+    assert all(rss > 0 for rss in stats['page_rss'])
+    assert len(stats['page_rss_growth']) == 2
+    assert all(growth >= 0 for growth in stats['page_rss_growth'])
+    assert stats['bytes'] == len(asset_page) + len(asset_page_one)
+    assert stats['read_seconds'] >= 0
+    assert stats['parse_seconds'] > 0
+
+
+@responses.activate(registry=OrderedRegistry)
+@pytest.mark.parametrize('engine', ['pydantic', 'fast'])
+def test_xml_handler_prefetch(test_session, asset_page, asset_page_one, engine):
+    responses.get('https://nourl.com/', body=asset_page_one)
+    responses.get('https://nourl.com/', body=asset_page)
+    stats = {}
+    data = xml_handler(
+        test_session,
+        path='',
+        params={},
+        model=Host,
+        tag='HOST',
+        engine=engine,
+        stats=stats,
+        prefetch=True,
+    )
+    assert len(list(data)) == 2
+    assert stats['pages'] == 2
+    assert len(responses.calls) == 2
+
+
+def test_find_next_url(asset_page_one, asset_page):
+    source = BytesIO(asset_page_one.encode())
+    assert find_next_url(source).startswith('https://')
+    assert source.tell() == 0
+    assert find_next_url(BytesIO(asset_page.encode())) is None
+
+
+@responses.activate(registry=OrderedRegistry)
+def test_xml_handler_prefetch_fallback(
+    test_session, asset_page, asset_page_one, monkeypatch
+):
+    # Shrink the tail so that the WARNING can't be found ahead of parsing.
+    monkeypatch.setattr(streaming, 'TAIL_SIZE', 8)
+    responses.get('https://nourl.com/', body=asset_page_one)
+    responses.get('https://nourl.com/', body=asset_page)
+    data = xml_handler(
+        test_session, path='', params={}, model=Host, tag='HOST', prefetch=True
+    )
+    assert len(list(data)) == 2
+    assert len(responses.calls) == 2
+
+
+def test_merge_streams():
+    merged = merge_streams([range(0, 500), range(500, 1000)], buffer_size=10)
+    assert sorted(merged) == list(range(1000))
+
+
+def test_merge_streams_error():
+    def broken():
+        yield 1
+        raise ValueError('shard failed')
+
+    with pytest.raises(ValueError, match='shard failed'):
+        list(merge_streams([broken(), iter(range(100))]))
+
+
+def test_merge_streams_early_stop():
+    release = threading.Event()
+    closed = threading.Event()
+
+    def slow():
+        try:
+            yield 1
+            release.wait(5)
+            yield 2
+        finally:
+            closed.set()
+
+    def unstarted():
+        yield 3
+
+    pending = unstarted()
+    merged = merge_streams([slow(), pending], max_workers=1)
+    assert next(merged) == 1
+    started = time.perf_counter()
+    merged.close()
+    # The consumer isn't held up until the running stream yields its next record.
+    assert time.perf_counter() - started < 1
+    assert inspect.getgeneratorstate(pending) == inspect.GEN_CLOSED
+    assert not closed.is_set()
+    release.set()
+    assert closed.wait(5)
+
+
+@pytest.mark.parametrize('module', [streaming, fastparse])
+def test_parse_page_releases_records(module, monkeypatch, host):
+    parsers = []
+    iterparse = module.iterparse
+
+    def tracked_iterparse(*args, **kwargs):
+        parsers.append(iterparse(*args, **kwargs))
+        return parsers[-1]
+
+    monkeypatch.setattr(module, 'iterparse', tracked_iterparse)
+    xml = (
+        '<HOST_LIST_OUTPUT><RESPONSE><HOST_LIST>'
+        f'{host * 5}'
+        '</HOST_LIST></RESPONSE></HOST_LIST_OUTPUT>'
+    )
+    records = list(module.parse_page(BytesIO(xml.encode()), Host, 'HOST', {}))
+    assert len(records) == 5
+    assert len(parsers[0].root.find('RESPONSE/HOST_LIST')) <= 1
+
+
+@responses.activate
+def test_handle_request_holds_slot(test_session, asset_page):
+    responses.get('https://nourl.com/', body=asset_page)
+    limiter = Throttle(concurrency=1)
+    first = handle_request(api=test_session, url='', throttle=limiter)
+    second = []
+    worker = threading.Thread(
+        target=lambda: second.append(
+            handle_request(api=test_session, url='', throttle=limiter)
+        )
+    )
+    worker.start()
+    worker.join(0.2)
+    # The first response is still open, so the second call must still be waiting.
+    assert second == []
+    assert len(responses.calls) == 1
+    first.close()
+    worker.join(5)
+    assert len(second) == 1
+    second[0].close()
+    first.close()
+    assert limiter._active == 0
+
+
+@responses.activate
+@pytest.mark.parametrize('prefetch', [False, True])
+def test_concurrent_streams_hold_slots(test_session, asset_page, prefetch):
+    responses.get('https://nourl.com/', body=asset_page)
+
+    class TrackedThrottle(Throttle):
+        peak = 0
+
+        def acquire(self):
+            super().acquire()
+            self.peak = max(self.peak, self._active)
+
+    test_session.throttle = TrackedThrottle(concurrency=1)
+    streams = [
+        xml_handler(test_session, '', {}, Host, 'HOST', prefetch=prefetch)
+        for _ in range(2)
+    ]
+    records = list(merge_streams(streams))
+    assert len(records) == 2
+    assert test_session.throttle.peak == 1
+    assert test_session.throttle._active == 0
@@ -0,0 +1,36 @@
+import pytest
+
+from qualys.api import throttle
+from qualys.api.throttle import Throttle, is_retryable
+
+
+@pytest.mark.parametrize(
+    'status,retryable',
+    [(409, True), (429, True), (500, True), (503, True), (400, False), (401, False)],
+)
+def test_is_retryable(status, retryable):
+    assert is_retryable(status) is retryable
+
+
+def test_throttle_update(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(throttle.time, 'sleep', sleeps.append)
+    limiter = Throttle(concurrency=1)
+    limiter.update({'X-RateLimit-Remaining': '10', 'X-Concurrency-Limit-Limit': '3'})
+    assert limiter.concurrency == 3
+    with limiter:
+        pass
+    assert sleeps == []
+
+    limiter.update({'X-RateLimit-Remaining': '0', 'X-RateLimit-Window-Sec': '60'})
+    with limiter:
+        pass
+    assert 59 < sleeps[0] <= 60
+
+
+def test_throttle_retry_delay():
+    limiter = Throttle(backoff=2, max_wait=10)
+    assert limiter.retry_delay({}, 1) == 2
+    assert limiter.retry_delay({}, 3) == 8
+    assert limiter.retry_delay({}, 5) == 10
+    assert limiter.retry_delay({'X-RateLimit-ToWait-Sec': '4'}, 5) == 4
@@ -1,9 +1,35 @@
+from collections import defaultdict
+from types import SimpleNamespace
+
 import pytest
 from tenable.io import TenableIO
 
 from qualys.api import QualysAPI
 
 
+class FakeJob:
+    """
+    Stand-in for a TenableIO sync job that records the objects added to it.
+    """
+
+    sync_id = 'tenable_qualys_vm'
+    uuid = '00000000-0000-0000-0000-000000000000'
+
+    def __init__(self):
+        self.objects = []
+        self.counters = defaultdict(lambda: {'accepted': 0})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def add(self, obj, object_type):
+        self.objects.append(obj)
+        self.counters[object_type]['accepted'] += 1
+
+
 @pytest.fixture
 def qapi():
     return QualysAPI(
@@ -22,6 +48,21 @@ def tapi():
     )
 
 
+@pytest.fixture
+def sync_tvm():
+    """
+    TenableIO stub whose sync jobs are `FakeJob` objects, collected in ``jobs``.
+    """
+    tvm = SimpleNamespace(jobs=[])
+
+    def create(sync_id):
+        tvm.jobs.append(FakeJob())
+        return tvm.jobs[-1]
+
+    tvm.sync = SimpleNamespace(create=create)
+    return tvm
+
+
 @pytest.fixture
 def host():
     return """
@@ -205,3 +246,31 @@ def kbs_page():
       </RESPONSE>
     </KNOWLEDGE_BASE_VULN_LIST_OUTPUT>
     """
+
+
+@pytest.fixture
+def posture_page():
+    return """
+    <POSTURE_INFO_LIST_OUTPUT>
+      <RESPONSE>
+        <DATETIME>2024-12-04T10:00:00Z</DATETIME>
+        <INFO_LIST>
+          <INFO>
+            <ID>1053421</ID>
+            <HOST_ID>12345</HOST_ID>
+            <CONTROL_ID>1071</CONTROL_ID>
+            <TECHNOLOGY_ID>45</TECHNOLOGY_ID>
+            <INSTANCE><![CDATA[os]]></INSTANCE>
+            <STATUS><![CDATA[Failed]]></STATUS>
+            <POSTURE_MODIFIED_DATE>2024-12-03T20:11:42Z</POSTURE_MODIFIED_DATE>
+            <FIRST_FAIL_DATE>2024-11-01T08:00:00Z</FIRST_FAIL_DATE>
+            <LAST_FAIL_DATE>2024-12-03T20:11:42Z</LAST_FAIL_DATE>
+            <CRITICALITY>
+              <LABEL><![CDATA[SERIOUS]]></LABEL>
+              <VALUE>3</VALUE>
+            </CRITICALITY>
+          </INFO>
+        </INFO_LIST>
+      </RESPONSE>
+    </POSTURE_INFO_LIST_OUTPUT>
+    """
@@ -1,4 +1,15 @@
-from qualys.database import Knowledgebase, init_db
+import sqlalchemy as sa
+
+from qualys.database import (
+    Knowledgebase,
+    KnowledgebaseIndex,
+    MappedKnowledgebase,
+    bulk_load,
+    get_state,
+    init_db,
+    set_state,
+    upsert_knowledgebase,
+)
 
 
 def test_knowledgebase_model():
@@ -15,3 +26,104 @@ def test_knowledgebase_model():
         session.add(kb2)
         session.commit()
         assert kb2.cves == []
+
+
+def test_knowledgebase_index():
+    db = init_db('sqlite:///:memory:')
+    with db.session() as session:
+        session.add(Knowledgebase(id=1, cves=['CVE-2024-0001', 'CVE-2024-0002']))
+        session.add(Knowledgebase(id=2, cves=['CVE-2024-0001', 'CVE-2024-0002']))
+        session.add(Knowledgebase(id=3, cves=[]))
+        session.commit()
+
+    index = KnowledgebaseIndex(db)
+    assert index.get(1) == ('CVE-2024-0001', 'CVE-2024-0002')
+    assert index.get(1) is index.get(2)
+    assert index.get(3) == ()
+    assert index.get(4) == ()
+    assert len(index) == 3
+    assert index.misses == 1
+
+
+def test_knowledgebase_index_lru():
+    db = init_db('sqlite:///:memory:')
+    with db.session() as session:
+        for qid in range(1, 5):
+            session.add(Knowledgebase(id=qid, cves=[f'CVE-2024-000{qid}']))
+        session.commit()
+
+    index = KnowledgebaseIndex(db, max_size=2)
+    assert index.get(1) == ('CVE-2024-0001',)
+    assert index.get(2) == ('CVE-2024-0002',)
+    assert index.get(1) == ('CVE-2024-0001',)
+    assert index.get(3) == ('CVE-2024-0003',)
+    assert len(index) == 2
+    assert index.get(5) == ()
+    assert index.hits == 1
+    assert index.misses == 4
+
+
+def test_mapped_knowledgebase(tmp_path):
+    db = init_db('sqlite:///:memory:')
+    with db.session() as session:
+        session.add(Knowledgebase(id=30, cves=['CVE-2024-0003']))
+        session.add(Knowledgebase(id=10, cves=['CVE-2024-0001', 'CVE-2024-0002']))
+        session.add(Knowledgebase(id=20, cves=[]))
+        session.commit()
+
+    store = MappedKnowledgebase(db, directory=tmp_path)
+    assert store.get(10) == ('CVE-2024-0001', 'CVE-2024-0002')
+    assert store.get(20) == ()
+    assert store.get(30) == ('CVE-2024-0003',)
+    assert store.get(5) == ()
+    assert store.get(40) == ()
+    assert len(store) == 3
+    assert store.hits == 3
+    assert store.misses == 2
+
+    with db.session() as session:
+        upsert_knowledgebase(session, [{'id': 40, 'cves': ['CVE-2024-0004']}])
+        session.commit()
+    store.load()
+    assert store.get(40) == ('CVE-2024-0004',)
+    store.close()
+    assert len(store) == 0
+
+
+def test_cache_state(tmp_path):
+    uri = f'sqlite:///{tmp_path / "cache.db"}'
+    db = init_db(uri)
+    with db.session() as session:
+        assert get_state(session, 'example') is None
+        set_state(session, 'example', 'value')
+        session.add(Knowledgebase(id=1, cves=['CVE-2024-0001']))
+        session.commit()
+
+    db = init_db(uri)
+    with db.session() as session:
+        assert get_state(session, 'example') == 'value'
+        assert session.get(Knowledgebase, 1).cves == ['CVE-2024-0001']
+
+    db = init_db(uri, flush=True)
+    with db.session() as session:
+        assert get_state(session, 'example') is None
+        assert session.get(Knowledgebase, 1) is None
+
+
+def test_bulk_upsert_knowledgebase(tmp_path):
+    db = init_db(f'sqlite:///{tmp_path / "cache.db"}')
+    with bulk_load(db.engine) as conn, db.session(bind=conn) as session:
+        assert conn.exec_driver_sql('PRAGMA synchronous').scalar() == 0
+        upsert_knowledgebase(session, [])
+        upsert_knowledgebase(
+            session,
+            [{'id': 1, 'cves': ['CVE-2024-0001']}, {'id': 2, 'cves': []}],
+        )
+        session.commit()
+        upsert_knowledgebase(session, [{'id': 2, 'cves': ['CVE-2024-0002']}])
+        session.commit()
+
+    with db.session() as session:
+        assert session.execute(sa.text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert session.get(Knowledgebase, 1).cves == ['CVE-2024-0001']
+        assert session.get(Knowledgebase, 2).cves == ['CVE-2024-0002']
@@ -1,14 +1,21 @@
+import re
+import threading
 from datetime import UTC, datetime
 
+import arrow
 import pytest
 import responses
+from responses.matchers import query_param_matcher
+from tenable.errors import APIError
 
+from qualys.api.models.findings import DetectionRecord
+from qualys.database import get_state
 from qualys.transform import Transformer
 
 
 @pytest.fixture
-def transformer(qapi, tapi):
-    return Transformer(tvm=tapi, qualys=qapi, db_uri='sqlite:///:memory:')
+def transformer(qapi, sync_tvm):
+    return Transformer(tvm=sync_tvm, qualys=qapi, db_uri='sqlite:///:memory:')
 
 
 def test_transformer_get_os_type(transformer):
@@ -149,3 +156,351 @@ def test_transform_finding(transformer, kbs_page):
     }
     transformer.cache_knowledgebase()
     assert transformer.transform_finding(mock_finding, asset_id) == tnx_finding
+    record = DetectionRecord(
+        **{k: v for k, v in mock_finding.items() if k in DetectionRecord.__slots__}
+    )
+    assert transformer.transform_finding(record, asset_id) == tnx_finding
+
+
+@responses.activate
+def test_finding_template_cache(transformer, kbs_page):
+    responses.get('https://nourl.qualys/api/2.0/fo/knowledge_base/vuln/', body=kbs_page)
+    transformer.cache_knowledgebase()
+    detection = {'id': 1, 'qid': 6, 'status': 'Fixed', 'severity': 5}
+    first = transformer.transform_finding(detection, 1)
+    second = transformer.transform_finding({**detection, 'id': 2}, 2)
+    assert first['cve'] is second['cve']
+    assert first['state'] == 'INACTIVE'
+    assert first['exposure'] == {'severity': {'level': 'CRITICAL'}}
+    assert transformer.transform_finding({'id': 3, 'qid': 999}, 3) == {}
+    assert transformer.finding_template(6, max_cves=0).cve == {'cves': []}
+    assert set(transformer._templates) == {(6, 512), (999, 512), (6, 0)}
+
+    transformer.cache_knowledgebase()
+    assert transformer._templates == {}
+
+
+@responses.activate
+@pytest.mark.parametrize('kb_store', ['memory', 'mmap'])
+def test_finding_template_cache_bounded(qapi, tapi, kbs_page, monkeypatch, kb_store):
+    responses.get('https://nourl.qualys/api/2.0/fo/knowledge_base/vuln/', body=kbs_page)
+    monkeypatch.setattr('qualys.transform.TEMPLATE_CACHE_SIZE', 2)
+    transformer = Transformer(
+        tvm=tapi, qualys=qapi, db_uri='sqlite:///:memory:', kb_store=kb_store
+    )
+    transformer.cache_knowledgebase()
+    for qid in (5, 6, 5, 7):
+        transformer.finding_template(qid)
+    # The hit on QID 5 keeps it cached, so QID 6 is the one evicted.
+    assert list(transformer._templates) == [(5, 512), (7, 512)]
+    assert transformer.stage('findings')['kb_lookups'] == 3
+
+
+@responses.activate
+def test_cache_knowledgebase_incremental(qapi, tapi, kbs_page, tmp_path):
+    url = 'https://nourl.qualys/api/2.0/fo/knowledge_base/vuln/'
+    uri = f'sqlite:///{tmp_path / "cache.db"}'
+    full = responses.get(
+        url,
+        body=kbs_page,
+        match=[
+            query_param_matcher(
+                {'last_modified_after': '1999-01-01'}, strict_match=False
+            )
+        ],
+    )
+    delta = responses.get(
+        url,
+        body=kbs_page,
+        match=[
+            query_param_matcher(
+                {'last_modified_after': '2018-01-04T17:39:37Z'}, strict_match=False
+            )
+        ],
+    )
+    Transformer(tvm=tapi, qualys=qapi, db_uri=uri).cache_knowledgebase()
+    transformer = Transformer(tvm=tapi, qualys=qapi, db_uri=uri)
+    assert transformer.kb.get(6) == ('CVE-1999-0001',)
+    transformer.cache_knowledgebase()
+    assert full.call_count == 1
+    assert delta.call_count == 1
+
+    Transformer(
+        tvm=tapi, qualys=qapi, db_uri=uri, flush_cache=True
+    ).cache_knowledgebase()
+    assert full.call_count == 2
+
+
+@responses.activate
+def test_lazy_knowledgebase(transformer, kbs_page, findings_page):
+    responses.get(
+        'https://nourl.qualys/api/2.0/fo/asset/host/vm/detection/', body=findings_page
+    )
+    kbs = responses.get(
+        'https://nourl.qualys/api/2.0/fo/knowledge_base/vuln/',
+        body=kbs_page,
+        match=[query_param_matcher({'ids': '237189'}, strict_match=False)],
+    )
+    spool, qids = transformer.spool_findings()
+    assert qids == {237189}
+    transformer.cache_knowledgebase(qids=qids)
+    assert kbs.call_count == 1
+    assert transformer.kb.get(6) == ('CVE-1999-0001',)
+    with transformer.db.session() as session:
+        assert get_state(session, 'kb_last_modified') is None
+
+    hosts = list(transformer.read_spool(spool))
+    assert spool.closed
+    assert hosts[0]['id'] == 123456
+    detection = hosts[0]['detections'][0]
+    assert detection['qid'] == 237189
+    assert detection['last_found'] == '2023-08-10T13:23:13+00:00'
+
+
+@responses.activate
+def test_sharded_detections(qapi, tapi, findings_page):
+    url = 'https://nourl.qualys/api/2.0/fo/asset/host/vm/detection/'
+    shards = [
+        responses.get(
+            url,
+            body=findings_page,
+            match=[query_param_matcher(params, strict_match=False)],
+        )
+        for params in (
+            {'id_max': '2'},
+            {'id_min': '3', 'id_max': '4'},
+            {'id_min': '5'},
+        )
+    ]
+    transformer = Transformer(
+        tvm=tapi, qualys=qapi, db_uri='sqlite:///:memory:', detection_shards=3
+    )
+    transformer.host_ids = [1, 2, 3, 4, 5, 6]
+    assert len(list(transformer.detections())) == 3
+    assert all(shard.call_count == 1 for shard in shards)
+
+
+@responses.activate
+def test_host_ids_reset_per_run(qapi, sync_tvm, asset_page):
+    responses.get('https://nourl.qualys/api/2.0/fo/asset/host/', body=asset_page)
+    transformer = Transformer(
+        tvm=sync_tvm,
+        qualys=qapi,
+        db_uri='sqlite:///:memory:',
+        detection_shards=2,
+    )
+    transformer.run(get_findings=False)
+    transformer.run(get_findings=False)
+    assert transformer.host_ids == [12345]
+
+
+@responses.activate
+def test_incremental_run(qapi, sync_tvm, kbs_page, findings_page, asset_page, tmp_path):
+    base = 'https://nourl.qualys/api/2.0/fo'
+    responses.get(f'{base}/knowledge_base/vuln/', body=kbs_page)
+    assets = responses.get(f'{base}/asset/host/', body=asset_page)
+    detections = responses.get(f'{base}/asset/host/vm/detection/', body=findings_page)
+    uri = f'sqlite:///{tmp_path / "cache.db"}'
+
+    counts = Transformer(tvm=sync_tvm, qualys=qapi, db_uri=uri).run(incremental=True)
+    assert counts['assets'] == {'sent': 1}
+    assert 'findings' in counts
+    assert 'vm_scan_since' not in assets.calls[0].request.params
+    assert 'detection_updated_since' not in detections.calls[0].request.params
+
+    transformer = Transformer(tvm=sync_tvm, qualys=qapi, db_uri=uri)
+    with transformer.db.session() as session:
+        last_run = get_state(session, 'last_successful_run')
+    assert '.' not in last_run
+    expected = arrow.get(last_run).format('YYYY-MM-DDTHH:mm:ss[Z]')
+    transformer.run(incremental=True)
+    assert assets.calls[1].request.params['vm_scan_since'] == expected
+    assert detections.calls[1].request.params['detection_updated_since'] == expected
+
+
+@responses.activate
+@pytest.mark.parametrize('lazy_kbs', [False, True])
+def test_single_pass_run(
+    transformer, sync_tvm, kbs_page, findings_page, host, lazy_kbs
+):
+    base = 'https://nourl.qualys/api/2.0/fo'
+    inventory_page = """
+    <HOST_LIST_OUTPUT><RESPONSE><HOST_LIST>
+      <HOST><ID>123456</ID><SERIAL_NUMBER>ABC123</SERIAL_NUMBER></HOST>
+      <HOST><ID>12345</ID></HOST>
+    </HOST_LIST></RESPONSE></HOST_LIST_OUTPUT>
+    """
+    asset_page = f"""
+    <HOST_LIST_OUTPUT><RESPONSE><HOST_LIST>{host}</HOST_LIST></RESPONSE>
+    </HOST_LIST_OUTPUT>
+    """
+    responses.get(f'{base}/knowledge_base/vuln/', body=kbs_page)
+    responses.get(f'{base}/asset/host/vm/detection/', body=findings_page)
+    inventory = responses.get(
+        f'{base}/asset/host/',
+        body=inventory_page,
+        match=[query_param_matcher({'action': 'list', 'truncation_limit': '10000'})],
+    )
+    missing = responses.get(
+        f'{base}/asset/host/',
+        body=asset_page,
+        match=[query_param_matcher({'ids': '12345'}, strict_match=False)],
+    )
+    counts = transformer.run(single_pass=True, lazy_kbs=lazy_kbs)
+    assert counts['assets'] == {'sent': 2}
+    assert counts['findings']['dropped'] == 1
+    stages = counts['stages']
+    assert stages['inventory']['records'] == 2
+    assert stages['detections']['records'] == 1
+    assert stages['detections']['bytes'] > 0
+    assert stages['assets']['records'] == 1
+    assert stages['knowledgebase']['cached'] == 1
+    assert stages['findings']['kb_lookups'] == 1
+    for key in ('read_seconds', 'parse_seconds', 'peak_rss_kib', 'max_page_growth_kib'):
+        assert key in stages['detections']
+    for key in ('transform_seconds', 'add_seconds'):
+        assert key in stages['assets']
+        assert key in stages['findings']
+    assert 'finalize_seconds' in stages['sync']
+    assert inventory.call_count == 1
+    assert missing.call_count == 1
+    objects = sync_tvm.jobs[-1].objects
+    assets = [o for o in objects if o['object_type'] == 'device-asset']
+    assert [a['id'] for a in assets] == ['123456', '12345']
+    assert assets[0]['device']['hardware']['serial_number'] == 'ABC123'
+
+
+@responses.activate
+@pytest.mark.parametrize('lazy_kbs', [False, True])
+def test_single_pass_asset_fidelity(
+    qapi, sync_tvm, kbs_page, host, asset_page, lazy_kbs
+):
+    base = 'https://nourl.qualys/api/2.0/fo'
+    # The detection endpoint returns the host without the inventory fields.
+    detection_host = re.sub(
+        r'\s*<(SERIAL_NUMBER|HARDWARE_UUID|FIRST_FOUND_DATE|AGENT_STATUS)>.*</\1>',
+        '',
+        host,
+    )
+    assert 'SERIAL_NUMBER' not in detection_host
+    detection_host = detection_host.replace(
+        '</HOST>',
+        """<DETECTION_LIST><DETECTION>
+          <UNIQUE_VULN_ID>1</UNIQUE_VULN_ID><QID>237189</QID><TYPE>Confirmed</TYPE>
+          <SEVERITY>5</SEVERITY><STATUS>Active</STATUS>
+        </DETECTION></DETECTION_LIST></HOST>""",
+    )
+    findings_page = f"""
+    <HOST_LIST_VM_DETECTION><RESPONSE><HOST_LIST>{detection_host}</HOST_LIST>
+    </RESPONSE></HOST_LIST_VM_DETECTION>
+    """
+    responses.get(f'{base}/knowledge_base/vuln/', body=kbs_page)
+    responses.get(f'{base}/asset/host/vm/detection/', body=findings_page)
+    responses.get(f'{base}/asset/host/', body=asset_page)
+
+    def device_assets(**kwargs):
+        transformer = Transformer(
+            tvm=sync_tvm, qualys=qapi, db_uri='sqlite:///:memory:'
+        )
+        transformer.run(**kwargs)
+        objects = sync_tvm.jobs[-1].objects
+        return [o for o in objects if o['object_type'] == 'device-asset']
+
+    two_pass = device_assets()
+    single_pass = device_assets(single_pass=True, lazy_kbs=lazy_kbs)
+    assert len(two_pass) == 1
+    assert two_pass[0]['device']['hardware']['serial_number']
+    assert single_pass == two_pass
+
+
+@responses.activate
+def test_mapped_knowledgebase_store(qapi, tapi, kbs_page):
+    responses.get('https://nourl.qualys/api/2.0/fo/knowledge_base/vuln/', body=kbs_page)
+    transformer = Transformer(
+        tvm=tapi, qualys=qapi, db_uri='sqlite:///:memory:', kb_store='mmap'
+    )
+    transformer.cache_knowledgebase()
+    finding = transformer.transform_finding({'id': 1, 'qid': 6}, 1)
+    assert finding['cve'] == {'cves': ['CVE-1999-0001']}
+
+
+@responses.activate
+@pytest.mark.parametrize('background_kbs', [True, False])
+def test_background_knowledgebase(
+    transformer, kbs_page, findings_page, asset_page, background_kbs
+):
+    base = 'https://nourl.qualys/api/2.0/fo'
+    kbs = responses.get(f'{base}/knowledge_base/vuln/', body=kbs_page)
+    responses.get(f'{base}/asset/host/', body=asset_page)
+    responses.get(f'{base}/asset/host/vm/detection/', body=findings_page)
+    counts = transformer.run(background_kbs=background_kbs)
+    assert kbs.call_count == 1
+    assert counts['assets'] == {'sent': 1}
+    assert counts['stages']['knowledgebase']['cached'] == 1
+    assert 'wait_seconds' in counts['stages']['knowledgebase']
+    assert len(transformer.kb) == 1
+
+
+@responses.activate
+def test_background_knowledgebase_error(transformer, asset_page):
+    base = 'https://nourl.qualys/api/2.0/fo'
+    responses.get(f'{base}/knowledge_base/vuln/', status=401)
+    responses.get(f'{base}/asset/host/', body=asset_page)
+    with pytest.raises(APIError):
+        transformer.run()
+
+
+@responses.activate
+def test_background_knowledgebase_abandoned(transformer, kbs_page):
+    base = 'https://nourl.qualys/api/2.0/fo'
+    release, finished = threading.Event(), threading.Event()
+
+    def slow_kbs(request):
+        release.wait(5)
+        finished.set()
+        return 200, {}, kbs_page
+
+    responses.add_callback(responses.GET, f'{base}/knowledge_base/vuln/', slow_kbs)
+    responses.get(f'{base}/asset/host/', status=401)
+    threads = set(threading.enumerate())
+    try:
+        with pytest.raises(APIError):
+            transformer.run()
+        # The asset error is raised while the KB download is still in flight.
+        assert not finished.is_set()
+    finally:
+        release.set()
+        # Let the abandoned worker wind down before the mocked API is torn down.
+        for thread in set(threading.enumerate()) - threads:
+            thread.join(5)
+    # The cancelled worker stops without storing the modification high-water mark.
+    with transformer.db.session() as session:
+        assert get_state(session, 'kb_last_modified') is None
+
+
+@responses.activate
+def test_cache_knowledgebase_cancelled(transformer, kbs_page):
+    responses.get('https://nourl.qualys/api/2.0/fo/knowledge_base/vuln/', body=kbs_page)
+    cancel = threading.Event()
+    cancel.set()
+    transformer.cache_knowledgebase(cancel=cancel)
+    with transformer.db.session() as session:
+        assert get_state(session, 'kb_last_modified') is None
+    assert len(transformer.kb) == 0
+
+
+@responses.activate
+def test_spool_dir_cleanup(
+    qapi, sync_tvm, kbs_page, findings_page, asset_page, tmp_path
+):
+    base = 'https://nourl.qualys/api/2.0/fo'
+    responses.get(f'{base}/knowledge_base/vuln/', body=kbs_page)
+    responses.get(f'{base}/asset/host/', body=asset_page)
+    responses.get(f'{base}/asset/host/vm/detection/', body=findings_page)
+    (tmp_path / 'keep.txt').write_text('unrelated')
+    transformer = Transformer(
+        tvm=sync_tvm, qualys=qapi, db_uri='sqlite:///:memory:', spool_dir=tmp_path
+    )
+    transformer.run()
+    assert (tmp_path / 'keep.txt').read_text() == 'unrelated'
+    assert not (tmp_path / 'qualys-spool').exists()